@@ -12,6 +12,8 @@ dependencies = [
     'argparse==1.2.1',
     'django-phonenumber-field==0.6',
     'docutils==0.12',
+    'futures==2.2.0',
+    'gunicorn==19.3.0',
     'mock==1.0.1',
     'pep8==1.5.7',
     'phonenumbers==6.2.0',
@@ -9,6 +9,7 @@ https://docs.djangoproject.com/en/1.6/ref/settings/
 """
 
 # Build paths inside the project like this: os.path.join(BASE_DIR, ...)
+import multiprocessing
 import os
 BASE_DIR = os.path.dirname(os.path.dirname(__file__))
 
@@ -69,6 +70,51 @@ DATABASES = {
     }
 }
 
+# Database connections are kept open between requests for
+# DATABASE_CONN_MAX_AGE seconds (None for no limit; 0 closes them after each
+# request), unless a database sets its own CONN_MAX_AGE. Set DATABASE_POOLER
+# to 'session' or 'transaction' when connecting through a pooler such as
+# PgBouncer in that mode (see whats_fresh/database.py). With
+# DATABASE_HEALTH_CHECKS, open connections are checked at the start of each
+# request, and broken ones replaced.
+DATABASE_CONN_MAX_AGE = 60
+DATABASE_POOLER = None
+DATABASE_HEALTH_CHECKS = True
+
+# Caches
+# https://docs.djangoproject.com/en/1.7/topics/cache/
+#
+# The 'api' cache holds rendered responses for the public /1/ API, and the
+# generation key which invalidates them. It is file based, so that every
+# server process shares the cached responses and their invalidation; a
+# local-memory cache would let the other processes serve stale responses.
+# File based caches without their own LOCATION are stored in DATA_DIR.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'api': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'TIMEOUT': 3600,
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    },
+    'geocoding': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'TIMEOUT': None,
+    }
+}
+
+# Directory for the data the application keeps between runs, which must not
+# be cleaned up like temporary files.
+DATA_DIR = os.path.join(BASE_DIR, 'data')
+
+# Response caching is turned off by the test settings, as test data is
+# rolled back without sending the signals that invalidate the cache.
+API_CACHE_ENABLED = True
+
 # Internationalization
 # https://docs.djangoproject.com/en/1.6/topics/i18n/
 
@@ -91,15 +137,116 @@ STATIC_URL = '/static/'
 MEDIA_ROOT = os.path.join('/home/vagrant/media')
 MEDIA_URL = '/media/'
 
+# collectstatic also writes gzip (and, with the brotli package, Brotli)
+# copies of CSS and JavaScript files, for the web server to send as they are.
+STATICFILES_STORAGE = (
+    'whats_fresh.whats_fresh_api.storage.CompressedStaticFilesStorage')
+
+# How /media/ files are sent in production: 'x-accel-redirect' (nginx) or
+# 'x-sendfile' (Apache mod_xsendfile, lighttpd) have the web server send
+# the file Django names. With None, they are only served while DEBUG is on.
+# For nginx, MEDIA_ACCEL_REDIRECT_LOCATION is an internal location serving
+# MEDIA_ROOT.
+MEDIA_SERVER = None
+MEDIA_ACCEL_REDIRECT_LOCATION = '/protected-media/'
+
+# Seconds media files may be cached by clients; files named after their
+# content hash never change.
+MEDIA_CACHE_MAX_AGE = 24 * 60 * 60
+MEDIA_HASHED_CACHE_MAX_AGE = 365 * 24 * 60 * 60
+
 # Proximity used for location queries if
 # proximity parameter is not also passed
 DEFAULT_PROXIMITY = 20
 
 PAGE_LENGTH = 15
 
+# Default and largest number of records per page for the paged /1/ API
+# endpoints
+API_PAGE_LENGTH = 100
+API_MAX_PAGE_LENGTH = 1000
+
+# Seconds /1/changes stays behind the present. A record's modified time is
+# set when it is saved, but it is only seen once its transaction commits;
+# the lag gives transactions that long to commit before a sync's until
+# timestamp passes their records by.
+API_CHANGES_LAG = 60
+
+# Stream whole (unlimited, unpaged) /1/vendors and /1/products listings,
+# encoding API_STREAM_CHUNK_SIZE records at a time. Streamed responses are
+# not stored in the response cache.
+API_STREAMING = False
+API_STREAM_CHUNK_SIZE = 500
+
+# Search /1/search with PostgreSQL full-text search. When off, products,
+# vendors and stories are searched with case-insensitive substring matches.
+API_FULL_TEXT_SEARCH = True
+
+# /1/vendors/tiles/<z>/<x>/<y> map tiles. Below API_TILE_CLUSTER_ZOOM, the
+# vendors in each cell of an API_TILE_CLUSTER_GRID by API_TILE_CLUSTER_GRID
+# grid over the tile are returned as one cluster.
+API_TILE_MAX_ZOOM = 20
+API_TILE_CLUSTER_ZOOM = 12
+API_TILE_CLUSTER_GRID = 8
+
+# Scaled copies of uploaded images, stored next to the original: the name
+# and largest width or height of each, and the formats they are saved in.
+# They are generated by a pool of IMAGE_RENDITION_WORKERS threads, or
+# during the upload request if it is 0, as it is in the test settings: the
+# worker threads can't see the uncommitted test data.
+IMAGE_RENDITIONS = (
+    ('thumbnail', 160),
+    ('medium', 640),
+    ('large', 1280),
+)
+IMAGE_RENDITION_FORMATS = ('JPEG', 'WEBP')
+IMAGE_RENDITION_WORKERS = 2
+
+# Uploads are streamed to a temporary file and hashed as they arrive, so
+# that repeated uploads of an image can share one file. Images with more
+# than IMAGE_MAX_PIXELS pixels are refused before they are decoded.
+FILE_UPLOAD_HANDLERS = (
+    'whats_fresh.whats_fresh_api.uploads.HashingFileUploadHandler',
+)
+IMAGE_MAX_PIXELS = 40 * 1000 * 1000
+
+# The production server, python manage.py serve: a gunicorn server with
+# WSGI_WORKERS processes (gunicorn's suggested two per CPU, plus one) of
+# WSGI_THREADS threads each; the workers share the file based 'api' and
+# 'geocoding' caches (see CACHES). Workers are replaced after about
+# WSGI_MAX_REQUESTS requests (plus up to WSGI_MAX_REQUESTS_JITTER, so they
+# don't all restart at once), and given WSGI_GRACEFUL_TIMEOUT seconds to
+# finish their requests on reload. With WSGI_WARM_UP, each worker imports
+# the views before accepting requests, and connects to the database if it
+# has a single thread.
+WSGI_BIND = '127.0.0.1:8000'
+WSGI_WORKERS = multiprocessing.cpu_count() * 2 + 1
+WSGI_THREADS = 1
+WSGI_KEEPALIVE = 2
+WSGI_TIMEOUT = 30
+WSGI_GRACEFUL_TIMEOUT = 30
+WSGI_MAX_REQUESTS = 1000
+WSGI_MAX_REQUESTS_JITTER = 100
+WSGI_PIDFILE = None
+WSGI_WARM_UP = True
+
 LOGIN_URL = '/login'
 
 DEFAULT_GROUP_NAME = 'Data Entry Users'
 
 # Title for the application UI
 SITE_TITLE = "Oregon's Catch"
+
+# Geocoders used to locate vendor addresses, tried in order. Addresses found
+# by the later ones are stored in the geocoding cache.
+GEOCODER_BACKENDS = (
+    'whats_fresh.whats_fresh_api.geocoding.CachedGeocoder',
+    'whats_fresh.whats_fresh_api.geocoding.GazetteerGeocoder',
+    'whats_fresh.whats_fresh_api.geocoding.GoogleGeocoder',
+)
+
+# A CSV file of known addresses, with address, lat and lng columns.
+GEOCODER_GAZETTEER = None
+
+# Seconds to wait for the Google Geocoding API.
+GEOCODER_TIMEOUT = 5.0
@@ -0,0 +1,34 @@
+# Imported by the settings module, so this must not import anything that
+# needs the settings.
+from django.core.exceptions import ImproperlyConfigured
+
+POOLER_MODES = (None, 'session', 'transaction')
+
+
+def configure_databases(databases, conn_max_age, pooler=None):
+    """
+    Fill in the connection settings of each database in databases which
+    doesn't set its own.
+
+    Connections are kept open between requests for conn_max_age seconds
+    (CONN_MAX_AGE; None keeps them open), except behind a pooler in session
+    mode: there, each Django connection holds on to a database connection,
+    so they are closed after each request and the pooler keeps them instead.
+
+    Behind a pooler in transaction mode, connections are kept open as
+    usual. Successive transactions may run on different database sessions,
+    which Django 1.7 and psycopg2 don't rely on, with one exception: on
+    connecting, Django runs SET TIME ZONE if the session's time zone isn't
+    UTC, so the database role must have it set (see the installation docs).
+    """
+    if pooler not in POOLER_MODES:
+        raise ImproperlyConfigured(
+            'DATABASE_POOLER must be one of %s, not %r.' % (
+                ', '.join(repr(mode) for mode in POOLER_MODES), pooler))
+
+    for database in databases.values():
+        if pooler == 'session':
+            database.setdefault('CONN_MAX_AGE', 0)
+        else:
+            database.setdefault('CONN_MAX_AGE', conn_max_age)
+    return databases
@@ -9,3 +9,32 @@ DATABASES = {
         'HOST': os.environ['HOST'],
     }
 }
+
+# Database connection settings, each optional
+if 'CONN_MAX_AGE' in os.environ:
+    # "none" keeps connections open without a time limit
+    if os.environ['CONN_MAX_AGE'].lower() == 'none':
+        DATABASE_CONN_MAX_AGE = None
+    else:
+        DATABASE_CONN_MAX_AGE = int(os.environ['CONN_MAX_AGE'])
+
+if os.environ.get('DATABASE_POOLER'):
+    DATABASE_POOLER = os.environ['DATABASE_POOLER']
+
+if 'DATABASE_HEALTH_CHECKS' in os.environ:
+    DATABASE_HEALTH_CHECKS = (
+        os.environ['DATABASE_HEALTH_CHECKS'].lower() in ('true', '1'))
+
+# Production server settings, each optional
+for name in ('DATA_DIR', 'WSGI_BIND', 'WSGI_PIDFILE'):
+    if name in os.environ:
+        globals()[name] = os.environ[name]
+
+for name in ('WSGI_WORKERS', 'WSGI_THREADS', 'WSGI_KEEPALIVE', 'WSGI_TIMEOUT',
+             'WSGI_GRACEFUL_TIMEOUT', 'WSGI_MAX_REQUESTS',
+             'WSGI_MAX_REQUESTS_JITTER'):
+    if name in os.environ:
+        globals()[name] = int(os.environ[name])
+
+if 'WSGI_WARM_UP' in os.environ:
+    WSGI_WARM_UP = os.environ['WSGI_WARM_UP'].lower() in ('true', '1')
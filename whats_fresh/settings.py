@@ -16,3 +16,11 @@ if os.environ.get('ENVIRONMENTCONFIG'):
     from whats_fresh.environment_config import *
 else:
     from .yaml_config import *
+
+# Finally, the connection settings are filled in for each database, and file
+# based caches without a LOCATION are placed in DATA_DIR.
+from whats_fresh.database import configure_databases
+configure_databases(DATABASES, DATABASE_CONN_MAX_AGE, DATABASE_POOLER)
+for alias, cache in CACHES.items():
+    if cache['BACKEND'].endswith('.FileBasedCache'):
+        cache.setdefault('LOCATION', os.path.join(DATA_DIR, alias))
@@ -0,0 +1,29 @@
+# flake8: noqa
+# Settings for running the test suite:
+#
+#     django-admin test whats_fresh --settings=whats_fresh.test_settings
+
+from .settings import *
+
+# Every cache is private to the test run. The response cache is off, as test
+# data is rolled back without sending the signals that invalidate it; the
+# tests of the cache turn it on with override_settings.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'api': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'whats-fresh-api',
+    },
+    'geocoding': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'whats-fresh-geocoding',
+        'TIMEOUT': None,
+    },
+}
+API_CACHE_ENABLED = False
+
+# Renditions are generated during the upload request, as worker threads
+# can't see the uncommitted test data.
+IMAGE_RENDITION_WORKERS = 0
@@ -10,9 +10,10 @@ urlpatterns = patterns(
     (r'^', include('whats_fresh.whats_fresh_api.urls')),
     )
 
-if settings.DEBUG:
-    # Allow statics to be served if in debug mode
+if settings.DEBUG or settings.MEDIA_SERVER:
+    # Media are served in debug mode, or handed to the web server with
+    # MEDIA_SERVER
     urlpatterns += patterns(
         '',
-        (r'^media/(?P<path>.*)$', 'django.views.static.serve', {
-            'document_root': settings.MEDIA_ROOT}))
+        (r'^media/(?P<path>.*)$',
+         'whats_fresh.whats_fresh_api.media.serve_media'))
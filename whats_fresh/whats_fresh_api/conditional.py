@@ -0,0 +1,68 @@
+from hashlib import md5
+
+from django.db.models import Count, Max
+from django.views.decorators.http import condition
+
+from whats_fresh.whats_fresh_api.response_cache import normalize_query
+
+
+def table_state(queryset):
+    """
+    Return the (latest modified time, row count) of a queryset in a single
+    aggregate query. Models without a modified field only report a count.
+    """
+    field_names = [f.name for f in queryset.model._meta.fields]
+    if 'modified' in field_names:
+        state = queryset.aggregate(modified=Max('modified'), count=Count('id'))
+        return state['modified'], state['count']
+    return None, queryset.count()
+
+
+def conditional(model, related=(), detail=False):
+    """
+    Add ETag and Last-Modified headers to a public API view, and answer
+    If-None-Match/If-Modified-Since with a 304 before the view runs.
+
+    The validators are computed from the latest modified time and the row
+    count of model -- only the row named by the id URL argument if detail is
+    True -- and of each of the related models whose data appears in the
+    response. The ETag also covers the path and the normalized query
+    string. Row counts let the ETag notice deletions, which do not move the
+    latest modified time; clients should prefer If-None-Match.
+
+    Edits are only noticed through the modified time, so the models passed
+    here need a modified field with auto_now; a model with only a count
+    would give a 304 after a row is changed in place. The many-to-many
+    tables of Story are the exception: their rows are never changed, only
+    added and removed when the story itself is saved.
+
+    The aggregate queries scan the tables, so apply this below
+    response_cache.cache_response: it is then only run on cache misses,
+    and cache hits are answered from the validators stored with the
+    response.
+    """
+    def get_state(request, id=None):
+        # condition() asks for the ETag and Last-Modified separately; only
+        # run the aggregate queries once per request.
+        if not hasattr(request, '_api_state'):
+            queryset = model.objects.all()
+            if detail:
+                queryset = queryset.filter(id=id)
+            request._api_state = [table_state(queryset)] + [
+                table_state(related_model.objects.all())
+                for related_model in related]
+        return request._api_state
+
+    # Other URL arguments (such as the tile coordinates) are covered by the
+    # path in the ETag.
+    def etag(request, id=None, **kwargs):
+        state = '%s?%s:%r' % (
+            request.path, normalize_query(request.GET),
+            get_state(request, id))
+        return md5(state.encode('utf-8')).hexdigest()
+
+    def last_modified(request, id=None, **kwargs):
+        modified = [m for m, count in get_state(request, id) if m]
+        return max(modified) if modified else None
+
+    return condition(etag_func=etag, last_modified_func=last_modified)
@@ -1,4 +1,6 @@
 import django.forms as forms
+from django.core.files.uploadedfile import UploadedFile
+from whats_fresh.whats_fresh_api import uploads
 from whats_fresh.whats_fresh_api.models import (Vendor, Product, Preparation,
                                                 Story, Video, Image)
 
@@ -87,3 +89,10 @@ class ImageForm(forms.ModelForm):
             'caption': forms.TextInput(attrs={'required': 'true'}),
             'name': forms.TextInput(attrs={'required': 'true'})
         }
+
+    def clean_image(self):
+        image = self.cleaned_data['image']
+        # Only new uploads are checked; an unchanged image is a FieldFile
+        if isinstance(image, UploadedFile):
+            uploads.check_pixels(image)
+        return image
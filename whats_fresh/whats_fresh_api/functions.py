@@ -1,4 +1,6 @@
-import requests
+import base64
+import json
+from collections import OrderedDict
 from django.conf import settings
 
 from django.contrib.auth.decorators import user_passes_test
@@ -15,30 +17,18 @@ class BadAddressException(Exception):
 def coordinates_from_address(street, city, state, zip):
     """
     This function returns a list of the coordinates from the address
-    passed using the Google Geocoding API. If the address given does not
-    return an exact coordinates (for instance, if the address can only be
-    located down to the city), a BadAddressException is thrown.
+    passed, using the geocoders in the GEOCODER_BACKENDS setting. If the
+    address given does not return an exact coordinates (for instance, if the
+    address can only be located down to the city), a BadAddressException is
+    thrown.
 
     TODO: this should probably return a tuple, rather than a list.
     """
-    try:
-        full_address = street + ", " + city + ", " + state + " " + zip
-        base_url = "https://maps.googleapis.com/maps/api/geocode/json?address="
-
-        response = requests.get(base_url + full_address)
-        location_data = response.json()
-
-        if location_data['results'][0][
-                'geometry']['location_type'] == 'APPROXIMATE':
-            raise BadAddressException("Address %s not found" % full_address)
+    from whats_fresh.whats_fresh_api.geocoding import geocode
 
-        lat = float(location_data['results'][0]['geometry']['location']['lat'])
-        long = float(
-            location_data['results'][0]['geometry']['location']['lng'])
-
-        return [lat, long]
-    except:
-        raise BadAddressException("Address %s not found" % full_address)
+    full_address = street + ", " + city + ", " + state + " " + zip
+    lat, long = geocode(full_address)
+    return [lat, long]
 
 
 def group_required(*group_names):
@@ -104,6 +94,114 @@ def get_lat_long_prox(request, error=None):
     return [point, proximity, limit, error]
 
 
+def get_nearest(request, error=None):
+    """
+    Parse the nearest-first parameters for the Vendor list functions:
+    ?nearest=true asks for vendors ordered nearest-first, and ?k=<int> for
+    only the k nearest vendors (implying nearest). Returns [nearest, k,
+    error]; k is None if it was not given.
+
+    If the parsing results in an error, the error block is updated to reflect
+    that error.
+    """
+    nearest = request.GET.get('nearest', '').lower() in ('true', '1')
+    k = request.GET.get('k', None)
+    if k is None:
+        return [nearest, None, error]
+    try:
+        k = int(k)
+        if k < 1:
+            raise ValueError("k must be positive")
+        return [True, k, error]
+    except Exception as e:
+        error = {
+            'debug': "{0}: {1}".format(type(e).__name__, str(e)),
+            'status': True,
+            'level': 'Warning',
+            'text': 'Invalid k. Returning all nearby vendors.',
+            'name': 'Bad K'
+        }
+        return [True, None, error]
+
+
+def nearest_first(queryset, point):
+    """
+    Order a Vendor queryset nearest-first to point, with the PostGIS <->
+    operator so that the ordering is an index scan of the spatial index on
+    Vendor.location, and select each vendor's distance from point in miles
+    as distance_mi.
+
+    <-> orders by planar distance in the coordinates' degrees, which is
+    close to, but not exactly, the order by true distance.
+    """
+    column = '"%s"."location"' % queryset.model._meta.db_table
+    return queryset.extra(
+        select=OrderedDict([
+            ('knn', '%s <-> ST_GeomFromEWKT(%%s)' % column),
+            ('distance_mi', 'ST_Distance(%s::geography, '
+                            'ST_GeomFromEWKT(%%s)::geography) / 1609.344'
+                            % column)]),
+        select_params=[point.ewkt, point.ewkt],
+        order_by=['knn'])
+
+
+BOOLEANS = {'true': True, '1': True, 'false': False, '0': False}
+
+
+def filter_vendors(request, queryset, error=None):
+    """
+    Apply the vendor filters to a Vendor queryset, returning [queryset,
+    error]:
+
+        ?city=<name> vendors in the city (ignoring case)
+        ?product=<id> vendors selling the product
+        ?preparation=<id> vendors selling a product with the preparation
+        ?available=<true|false> vendors with a product (matching the product
+            and preparation filters) marked available or unavailable
+        ?status=<true|false> vendors with the given status
+
+    The product filters apply to the same vendor product, and are matched
+    with a single subquery on VendorProduct.
+
+    If a filter can't be parsed it is ignored, and the error block is
+    updated to reflect that error.
+    """
+    from whats_fresh.whats_fresh_api.models import VendorProduct
+
+    filters = {}
+    product_filters = {}
+    params = (
+        ('city', filters, 'city__iexact', None),
+        ('status', filters, 'status', BOOLEANS.__getitem__),
+        ('product', product_filters, 'product_preparation__product_id', int),
+        ('preparation', product_filters,
+         'product_preparation__preparation_id', int),
+        ('available', product_filters, 'available', BOOLEANS.__getitem__))
+
+    for param, lookups, lookup, parse in params:
+        value = request.GET.get(param, None)
+        if value is None:
+            continue
+        try:
+            lookups[lookup] = parse(value.lower()) if parse else value
+        except Exception as e:
+            error = {
+                'debug': "{0}: {1}".format(type(e).__name__, str(e)),
+                'status': True,
+                'level': 'Warning',
+                'text': 'Invalid {0} filter {1}. Ignoring it.'.format(
+                    param, value),
+                'name': 'Bad Filter'
+            }
+
+    if filters:
+        queryset = queryset.filter(**filters)
+    if product_filters:
+        queryset = queryset.filter(id__in=VendorProduct.objects.filter(
+            **product_filters).values('vendor_id'))
+    return [queryset, error]
+
+
 def get_limit(request, error=None):
     """
     Return the limit requested by the user.
@@ -125,3 +223,111 @@ def get_limit(request, error=None):
             'name': 'Bad Limit'
         }
         return [None, error]
+
+
+class BadCursorException(Exception):
+
+    """
+    The exception thrown if a pagination cursor can not be decoded.
+    """
+
+
+def encode_cursor(position):
+    """
+    Encode a pagination position (any JSON-serializable value) as an opaque,
+    URL-safe cursor string.
+    """
+    return base64.urlsafe_b64encode(json.dumps(position)).rstrip('=')
+
+
+def decode_cursor(cursor):
+    """
+    Decode a cursor created by encode_cursor. A BadCursorException is thrown
+    if the cursor is not valid.
+    """
+    try:
+        padding = '=' * (-len(cursor) % 4)
+        return json.loads(base64.urlsafe_b64decode(str(cursor) + padding))
+    except Exception:
+        raise BadCursorException("Cursor %s is not valid" % cursor)
+
+
+def paginate(request, queryset, limit=None, error=None):
+    """
+    Return one page of queryset, as [objects, cursors, error].
+
+    Requests with neither the ?page_size=<int> nor the ?cursor=<cursor>
+    parameter are not paged: objects is queryset[:limit], and cursors is
+    None. Otherwise the objects are ordered by id and fetched with a keyset
+    condition on it, so any page costs the same to fetch; cursors is a dict
+    with the next and prev cursors, or None where there is no such page.
+
+    If the parameters result in an error, the error block is updated to
+    reflect that error, and the first page is returned.
+    """
+    cursor = request.GET.get('cursor', None)
+    page_size = request.GET.get('page_size', None)
+
+    if cursor is None and page_size is None:
+        return [queryset[:limit], None, error]
+
+    position = {}
+    if cursor:
+        try:
+            position = decode_cursor(cursor)
+            page_size = int(position['size'])
+            for key in ('after', 'before'):
+                if key in position:
+                    position[key] = int(position[key])
+        except (BadCursorException, KeyError, TypeError, ValueError) as e:
+            error = {
+                'debug': "{0}: {1}".format(type(e).__name__, str(e)),
+                'status': True,
+                'level': 'Warning',
+                'text': 'Invalid cursor. Returning the first page.',
+                'name': 'Bad Cursor'
+            }
+            position = {}
+            page_size = None
+
+    try:
+        page_size = int(page_size)
+        if page_size < 1:
+            raise ValueError("Page size must be positive")
+    except (TypeError, ValueError) as e:
+        if page_size is not None:
+            error = {
+                'debug': "{0}: {1}".format(type(e).__name__, str(e)),
+                'status': True,
+                'level': 'Warning',
+                'text': 'Invalid page size. Returning the default size.',
+                'name': 'Bad Page Size'
+            }
+        page_size = settings.API_PAGE_LENGTH
+    page_size = min(page_size, settings.API_MAX_PAGE_LENGTH)
+
+    # One extra row is fetched to find out whether there is another page
+    if 'before' in position:
+        objects = list(queryset.filter(
+            id__lt=position['before']).order_by('-id')[:page_size + 1])
+        more = len(objects) > page_size
+        objects = objects[:page_size][::-1]
+        has_next, has_prev = True, more
+    else:
+        if 'after' in position:
+            queryset = queryset.filter(id__gt=position['after'])
+        objects = list(queryset.order_by('id')[:page_size + 1])
+        more = len(objects) > page_size
+        objects = objects[:page_size]
+        has_next, has_prev = more, 'after' in position
+
+    # An empty page (its rows were deleted) links back to its own position
+    cursors = {'next': None, 'prev': None}
+    if has_next:
+        last = objects[-1].id if objects else position['before'] - 1
+        cursors['next'] = encode_cursor({'after': last, 'size': page_size})
+    if has_prev:
+        first = objects[0].id if objects else position['after'] + 1
+        cursors['prev'] = encode_cursor({'before': first, 'size': page_size})
+
+    return [objects, cursors, error]
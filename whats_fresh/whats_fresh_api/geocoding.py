@@ -0,0 +1,156 @@
+import csv
+import logging
+import re
+import threading
+from hashlib import md5
+
+import requests
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.module_loading import import_string
+
+from whats_fresh.whats_fresh_api.functions import BadAddressException
+
+CACHE_ALIAS = 'geocoding'
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_address(address):
+    """
+    Return address in a canonical form -- lowercase, without punctuation,
+    and with single spaces -- so that trivially different spellings of an
+    address share a cache entry.
+    """
+    address = re.sub(r'[^\w\s]', ' ', address.lower(), flags=re.UNICODE)
+    return ' '.join(address.split())
+
+
+class Geocoder(object):
+
+    """
+    A geocoder backend. geocode() returns the (latitude, longitude) of an
+    address, or None if the backend does not know the address. Backends
+    raise BadAddressException when they know an address can't be located
+    exactly, which stops the remaining backends from being tried.
+
+    Backends are listed, in the order they are tried, in the
+    GEOCODER_BACKENDS setting. store() is called on every backend that was
+    tried, with the coordinates found by a later one. This base class knows
+    no addresses, and stores nothing.
+    """
+
+    def geocode(self, address):
+        return None
+
+    def store(self, address, coordinates):
+        pass
+
+
+class CachedGeocoder(Geocoder):
+
+    """
+    Looks addresses up in, and stores them to, the 'geocoding' cache. With
+    a persistent cache backend (the default is file based), an address is
+    only ever geocoded once. Errors from the cache backend, such as a
+    cache directory which isn't writable, are logged and otherwise ignored,
+    so that the other backends still locate the address.
+    """
+
+    cache_alias = CACHE_ALIAS
+
+    def key(self, address):
+        return 'whats-fresh:geocode:%s' % md5(
+            normalize_address(address).encode('utf-8')).hexdigest()
+
+    def geocode(self, address):
+        try:
+            coordinates = caches[self.cache_alias].get(self.key(address))
+        except Exception:
+            logger.exception('Could not read the geocoding cache')
+            return None
+        return tuple(coordinates) if coordinates else None
+
+    def store(self, address, coordinates):
+        try:
+            caches[self.cache_alias].set(
+                self.key(address), coordinates, None)
+        except Exception:
+            logger.exception('Could not write to the geocoding cache')
+
+
+class GazetteerGeocoder(Geocoder):
+
+    """
+    Looks addresses up in a local CSV gazetteer, the file named by the
+    GEOCODER_GAZETTEER setting, with address, lat and lng columns. The file
+    is read once, on the first lookup.
+    """
+
+    _lock = threading.Lock()
+    _gazetteers = {}
+
+    def load(self):
+        path = getattr(settings, 'GEOCODER_GAZETTEER', None)
+        if not path:
+            return {}
+        with self._lock:
+            if path not in self._gazetteers:
+                gazetteer = {}
+                with open(path) as gazetteer_file:
+                    for row in csv.DictReader(gazetteer_file):
+                        gazetteer[normalize_address(row['address'])] = (
+                            float(row['lat']), float(row['lng']))
+                self._gazetteers[path] = gazetteer
+        return self._gazetteers[path]
+
+    def geocode(self, address):
+        return self.load().get(normalize_address(address))
+
+
+class GoogleGeocoder(Geocoder):
+
+    """
+    Geocodes addresses with the Google Geocoding API. Requests share a
+    pooled session, and give up after GEOCODER_TIMEOUT seconds.
+    """
+
+    base_url = "https://maps.googleapis.com/maps/api/geocode/json"
+    session = requests.Session()
+
+    def geocode(self, address):
+        try:
+            response = self.session.get(
+                self.base_url, params={'address': address},
+                timeout=settings.GEOCODER_TIMEOUT)
+            location_data = response.json()
+            result = location_data['results'][0]['geometry']
+        except Exception:
+            raise BadAddressException("Address %s not found" % address)
+
+        if result['location_type'] == 'APPROXIMATE':
+            raise BadAddressException("Address %s not found" % address)
+
+        return (float(result['location']['lat']),
+                float(result['location']['lng']))
+
+
+def get_backends():
+    return [import_string(path)() for path in settings.GEOCODER_BACKENDS]
+
+
+def geocode(address):
+    """
+    Return the (latitude, longitude) of address from the first of the
+    GEOCODER_BACKENDS that can locate it. A BadAddressException is thrown
+    if none of them can.
+    """
+    tried = []
+    for backend in get_backends():
+        coordinates = backend.geocode(address)
+        if coordinates is not None:
+            for earlier in tried:
+                earlier.store(address, coordinates)
+            return coordinates
+        tried.append(backend)
+    raise BadAddressException("Address %s not found" % address)
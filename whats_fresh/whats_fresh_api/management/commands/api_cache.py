@@ -0,0 +1,32 @@
+from optparse import make_option
+
+from django.core.management.base import BaseCommand
+
+from whats_fresh.whats_fresh_api import response_cache
+
+
+class Command(BaseCommand):
+    help = ('Show the hit and miss counters of the API response cache, '
+            'optionally clearing the cache or resetting the counters.')
+
+    option_list = BaseCommand.option_list + (
+        make_option('--clear', action='store_true', dest='clear',
+                    default=False,
+                    help='Invalidate every cached API response.'),
+        make_option('--reset-stats', action='store_true', dest='reset_stats',
+                    default=False,
+                    help='Reset the hit and miss counters.'),
+    )
+
+    def handle(self, *args, **options):
+        stats = response_cache.cache_stats()
+        self.stdout.write('Hits: %d' % stats['hits'])
+        self.stdout.write('Misses: %d' % stats['misses'])
+        self.stdout.write('Hit ratio: %.1f%%' % (stats['ratio'] * 100))
+
+        if options['clear']:
+            response_cache.invalidate()
+            self.stdout.write('Cache cleared.')
+        if options['reset_stats']:
+            response_cache.reset_stats()
+            self.stdout.write('Counters reset.')
@@ -0,0 +1,241 @@
+import csv
+import json
+import os
+import time
+from itertools import islice
+from multiprocessing.pool import ThreadPool
+from optparse import make_option
+
+from django.contrib.gis.geos import fromstr
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from whats_fresh.whats_fresh_api import response_cache
+from whats_fresh.whats_fresh_api.functions import (coordinates_from_address,
+                                                   BadAddressException)
+from whats_fresh.whats_fresh_api.models import (Vendor, VendorProduct,
+                                                ProductPreparation)
+
+VENDOR_FIELDS = ('name', 'description', 'hours', 'street', 'city', 'state',
+                 'zip', 'location_description', 'status', 'contact_name',
+                 'website', 'email', 'phone')
+ADDRESS_FIELDS = ('street', 'city', 'state', 'zip')
+NULLABLE_FIELDS = ('status', 'phone')
+FORMATS = {'.csv': 'csv', '.json': 'json', '.jsonl': 'jsonl',
+           '.ndjson': 'jsonl'}
+
+
+def decode(value):
+    if isinstance(value, bytes):
+        return value.decode('utf-8')
+    return value
+
+
+def read_rows(path, format):
+    """
+    Yield (row number, row) for each vendor in the file. CSV and JSON lines
+    files are read a row at a time; a JSON file holding a single list of
+    vendors is read whole.
+    """
+    with open(path, 'rb' if format == 'csv' else 'r') as vendor_file:
+        if format == 'csv':
+            rows = csv.DictReader(vendor_file)
+        elif format == 'jsonl':
+            rows = (json.loads(line) for line in vendor_file if line.strip())
+        else:
+            rows = json.load(vendor_file)
+
+        for number, row in enumerate(rows, 1):
+            yield number, dict(
+                (decode(key), decode(value) if value is not None else '')
+                for key, value in row.items())
+
+
+def geocode(row):
+    """
+    Return ((latitude, longitude), error) for a row, using its lat and lng
+    columns if they are given and geocoding its address otherwise.
+    """
+    try:
+        if row.get('lat') and row.get('lng'):
+            return (float(row['lat']), float(row['lng'])), None
+        return coordinates_from_address(
+            *[row.get(field, '') for field in ADDRESS_FIELDS]), None
+    except ValueError:
+        return None, "Bad latitude or longitude."
+    except BadAddressException:
+        return None, "Full address is required."
+
+
+def next_vendor_ids(count):
+    """
+    Reserve count ids from the vendor id sequence. bulk_create does not set
+    the ids of the objects it creates, and they are needed to link the new
+    vendors to their products.
+    """
+    cursor = connection.cursor()
+    cursor.execute(
+        "SELECT nextval(pg_get_serial_sequence(%s, 'id')) "
+        "FROM generate_series(1, %s)", [Vendor._meta.db_table, count])
+    return [row[0] for row in cursor.fetchall()]
+
+
+def vendor_key(vendor):
+    return (vendor.name,) + tuple(
+        getattr(vendor, field) for field in ADDRESS_FIELDS)
+
+
+class Command(BaseCommand):
+    args = '<file>'
+    help = ('Import vendors from a CSV, JSON or JSON lines file. Columns are '
+            'the vendor fields, preparation_ids (a comma separated list of '
+            'product preparation ids), and optionally lat and lng. Vendors '
+            'which already exist are skipped, so an interrupted import can '
+            'be run again.')
+
+    option_list = BaseCommand.option_list + (
+        make_option('--format', dest='format', default=None,
+                    choices=sorted(set(FORMATS.values())),
+                    help='File format, by default taken from the file '
+                         'extension.'),
+        make_option('--batch-size', dest='batch_size', type='int',
+                    default=100,
+                    help='Number of vendors saved in each transaction.'),
+        make_option('--workers', dest='workers', type='int', default=4,
+                    help='Number of addresses geocoded at once.'),
+    )
+
+    def handle(self, path=None, *args, **options):
+        if not path:
+            raise CommandError('Usage: manage.py import_vendors %s' %
+                               self.args)
+        if not os.path.exists(path):
+            raise CommandError('File %s does not exist.' % path)
+
+        format = options['format'] or FORMATS.get(
+            os.path.splitext(path)[1].lower())
+        if not format:
+            raise CommandError('Unknown format; use --format.')
+        if options['batch_size'] < 1 or options['workers'] < 1:
+            raise CommandError('--batch-size and --workers must be positive.')
+
+        self.preparations = set(
+            ProductPreparation.objects.values_list('id', flat=True))
+        self.counts = {'read': 0, 'imported': 0, 'skipped': 0, 'failed': 0}
+        started = time.time()
+
+        rows = read_rows(path, format)
+        pool = ThreadPool(options['workers'])
+        try:
+            while True:
+                batch = list(islice(rows, options['batch_size']))
+                if not batch:
+                    break
+                self.import_batch(batch, pool)
+                self.report(started)
+        finally:
+            pool.close()
+            pool.join()
+
+            # bulk_create does not send the signals which invalidate the
+            # cached API responses.
+            if self.counts['imported']:
+                response_cache.invalidate()
+
+        self.stdout.write(
+            'Done: %(imported)d imported, %(skipped)d already existed, '
+            '%(failed)d failed.' % self.counts)
+
+    def report(self, started):
+        elapsed = time.time() - started
+        self.stdout.write(
+            '%d rows read, %d vendors imported (%.1f rows/s)' % (
+                self.counts['read'], self.counts['imported'],
+                self.counts['read'] / elapsed if elapsed else 0))
+
+    def error(self, number, message):
+        self.counts['failed'] += 1
+        self.stderr.write('Row %d: %s' % (number, message))
+
+    def build(self, row):
+        """
+        Return an unsaved Vendor and the list of its product preparation
+        ids, or throw a ValidationError if the row is not a valid vendor.
+        """
+        fields = dict((field, row.get(field, '')) for field in VENDOR_FIELDS)
+        for field in NULLABLE_FIELDS:
+            fields[field] = fields[field] or None
+        vendor = Vendor(**fields)
+        vendor.full_clean(exclude=['location', 'story'])
+
+        try:
+            preparation_ids = set(
+                int(id) for id in row.get('preparation_ids', '').split(',')
+                if id.strip())
+        except ValueError:
+            raise ValidationError(
+                {'preparation_ids': ['Bad product preparation id.']})
+        if not preparation_ids:
+            raise ValidationError(
+                {'preparation_ids': ['You must choose at least one product.']})
+        unknown = preparation_ids - self.preparations
+        if unknown:
+            raise ValidationError({'preparation_ids': [
+                'Unknown product preparation %s.' % ', '.join(
+                    str(id) for id in sorted(unknown))]})
+
+        return vendor, sorted(preparation_ids)
+
+    def import_batch(self, batch, pool):
+        self.counts['read'] += len(batch)
+
+        rows = []
+        for number, row in batch:
+            try:
+                vendor, preparation_ids = self.build(row)
+            except ValidationError as e:
+                self.error(number, '; '.join(
+                    '%s: %s' % (field, ' '.join(messages))
+                    for field, messages in sorted(e.message_dict.items())))
+                continue
+            rows.append((number, row, vendor, preparation_ids))
+
+        # Skip vendors saved by an earlier run, or earlier in this file
+        existing = set(Vendor.objects.filter(
+            name__in=[vendor.name for _, _, vendor, _ in rows]).values_list(
+                'name', *ADDRESS_FIELDS))
+        new_rows = []
+        for number, row, vendor, preparation_ids in rows:
+            if vendor_key(vendor) in existing:
+                self.counts['skipped'] += 1
+            else:
+                existing.add(vendor_key(vendor))
+                new_rows.append((number, row, vendor, preparation_ids))
+
+        locations = pool.map(geocode, [row for _, row, _, _ in new_rows])
+
+        vendors = []
+        for (number, _, vendor, preparation_ids), (coordinates, error) in zip(
+                new_rows, locations):
+            if error:
+                self.error(number, error)
+                continue
+            vendor.location = fromstr(
+                'POINT(%s %s)' % (coordinates[1], coordinates[0]), srid=4326)
+            vendors.append((vendor, preparation_ids))
+
+        if not vendors:
+            return
+
+        with transaction.atomic():
+            for (vendor, _), id in zip(
+                    vendors, next_vendor_ids(len(vendors))):
+                vendor.id = id
+            Vendor.objects.bulk_create([vendor for vendor, _ in vendors])
+            VendorProduct.objects.bulk_create([
+                VendorProduct(vendor_id=vendor.id, product_preparation_id=id)
+                for vendor, preparation_ids in vendors
+                for id in preparation_ids])
+
+        self.counts['imported'] += len(vendors)
@@ -0,0 +1,92 @@
+from optparse import make_option
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from gunicorn.app.base import BaseApplication
+
+from whats_fresh.whats_fresh_api.warmup import warm_up
+
+
+def post_worker_init(worker):
+    if settings.WSGI_WARM_UP:
+        # Django's connections are per thread: only a single-threaded
+        # worker answers requests in the thread which runs this.
+        warm_up(connect=worker.cfg.threads == 1)
+
+
+def gunicorn_options(bind=None, workers=None, threads=None):
+    """
+    Return the gunicorn settings for the WSGI_* settings, overridden by the
+    serve command's options.
+    """
+    if workers is None:
+        workers = settings.WSGI_WORKERS
+    if threads is None:
+        threads = settings.WSGI_THREADS
+    if workers < 1 or threads < 1:
+        raise CommandError(
+            'There must be at least one worker and one thread per worker.')
+
+    options = {
+        'bind': [bind or settings.WSGI_BIND],
+        'workers': workers,
+        'threads': threads,
+        'keepalive': settings.WSGI_KEEPALIVE,
+        'timeout': settings.WSGI_TIMEOUT,
+        'graceful_timeout': settings.WSGI_GRACEFUL_TIMEOUT,
+        'max_requests': settings.WSGI_MAX_REQUESTS,
+        'max_requests_jitter': settings.WSGI_MAX_REQUESTS_JITTER,
+        'post_worker_init': post_worker_init,
+    }
+    if settings.WSGI_PIDFILE:
+        options['pidfile'] = settings.WSGI_PIDFILE
+    return options
+
+
+class Server(BaseApplication):
+
+    """
+    A gunicorn server for whats_fresh.wsgi.application, configured by
+    options rather than by gunicorn's command line or configuration file.
+    """
+
+    def __init__(self, options):
+        self.options = options
+        super(Server, self).__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        from whats_fresh.wsgi import application
+        return application
+
+
+class Command(BaseCommand):
+    help = ('Run the production server: a gunicorn pre-fork server for '
+            'whats_fresh.wsgi.application, configured by the WSGI_* '
+            'settings. Send the server HUP to reload it gracefully.')
+
+    option_list = BaseCommand.option_list + (
+        make_option('--bind', dest='bind', default=None,
+                    help='Address to listen on, as host:port or '
+                    'unix:path (default WSGI_BIND).'),
+        make_option('--workers', dest='workers', type='int', default=None,
+                    help='Number of worker processes (default '
+                    'WSGI_WORKERS).'),
+        make_option('--threads', dest='threads', type='int', default=None,
+                    help='Number of threads per worker (default '
+                    'WSGI_THREADS).'),
+    )
+
+    def handle(self, *args, **options):
+        # The workers are forked from this process; they must not share
+        # its database connections.
+        for connection in connections.all():
+            connection.close()
+
+        Server(gunicorn_options(
+            bind=options['bind'], workers=options['workers'],
+            threads=options['threads'])).run()
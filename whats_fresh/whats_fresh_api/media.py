@@ -0,0 +1,82 @@
+import mimetypes
+import os
+import posixpath
+import re
+import time
+
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.utils.http import http_date
+from django.utils.six.moves.urllib.parse import unquote
+from django.views import static
+
+# Uploaded files are named after their content hash (see
+# uploads.image_upload_to), as are their renditions: images/cat.<hash>.jpg,
+# images/cat.<hash>.thumbnail.jpg. A file with such a name never changes.
+HASHED_NAME = re.compile(r'\.[0-9a-f]{12}(\.[a-z]+)?\.[^.]+$')
+
+
+def media_path(path):
+    """
+    Return path, relative to MEDIA_ROOT, with any . and .. components
+    resolved, or raise Http404 if it points outside MEDIA_ROOT.
+    """
+    path = posixpath.normpath(unquote(path)).lstrip('/')
+    if path in ('', '.') or path.startswith('..'):
+        raise Http404('"%s" is not a media file.' % path)
+    return path
+
+
+def cache_headers(response, path):
+    """
+    Set the caching headers of a media file: files with hashed names can be
+    cached forever, others for MEDIA_CACHE_MAX_AGE seconds.
+    """
+    if HASHED_NAME.search(path):
+        max_age = settings.MEDIA_HASHED_CACHE_MAX_AGE
+        response['Cache-Control'] = 'public, max-age=%d, immutable' % max_age
+    else:
+        max_age = settings.MEDIA_CACHE_MAX_AGE
+        response['Cache-Control'] = 'public, max-age=%d' % max_age
+    response['Expires'] = http_date(time.time() + max_age)
+    return response
+
+
+def serve_media(request, path):
+    """
+    */media/<path>*
+
+    Serves an uploaded file. With the MEDIA_SERVER setting, the response
+    only names the file, and the web server in front of Django sends it:
+
+    * 'x-accel-redirect' (nginx) redirects to MEDIA_ACCEL_REDIRECT_LOCATION
+      followed by the path, an internal location serving MEDIA_ROOT.
+    * 'x-sendfile' (Apache mod_xsendfile, lighttpd) names the file by its
+      full path.
+
+    Without MEDIA_SERVER the file is read and sent by Django, which is only
+    meant for development.
+    """
+    path = media_path(path)
+    full_path = os.path.join(settings.MEDIA_ROOT, path)
+    if not os.path.isfile(full_path):
+        raise Http404('"%s" does not exist.' % path)
+
+    server = settings.MEDIA_SERVER
+    if server == 'x-accel-redirect':
+        response = HttpResponse()
+        response['X-Accel-Redirect'] = (
+            settings.MEDIA_ACCEL_REDIRECT_LOCATION + path)
+    elif server == 'x-sendfile':
+        response = HttpResponse()
+        response['X-Sendfile'] = full_path
+    else:
+        response = static.serve(
+            request, path, document_root=settings.MEDIA_ROOT)
+        return cache_headers(response, path)
+
+    # The web server sends the file's contents, but the other headers are
+    # ours.
+    content_type, encoding = mimetypes.guess_type(full_path)
+    response['Content-Type'] = content_type or 'application/octet-stream'
+    return cache_headers(response, path)
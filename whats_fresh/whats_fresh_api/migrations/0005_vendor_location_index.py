@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations
+
+# Create a GiST index on Vendor.location unless one already exists (Django
+# creates one with the table, but databases restored from dumps or created
+# by hand may be missing it). Nearest-first vendor queries depend on it.
+CREATE_INDEX = """
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1
+        FROM pg_index i
+        JOIN pg_class t ON t.oid = i.indrelid
+        JOIN pg_class ix ON ix.oid = i.indexrelid
+        JOIN pg_am am ON am.oid = ix.relam
+        JOIN pg_attribute a ON a.attrelid = t.oid AND a.attnum = ANY(i.indkey)
+        WHERE t.relname = 'whats_fresh_api_vendor'
+            AND a.attname = 'location'
+            AND am.amname = 'gist'
+    ) THEN
+        CREATE INDEX whats_fresh_api_vendor_location_gist
+            ON whats_fresh_api_vendor USING GIST (location);
+    END IF;
+END
+$$;
+"""
+
+DROP_INDEX = "DROP INDEX IF EXISTS whats_fresh_api_vendor_location_gist;"
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('whats_fresh_api', '0004_tombstone'),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_INDEX, DROP_INDEX)
+    ]
@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations
+
+# Case-insensitive prefix indexes on the names searched by the entry
+# interface's typeahead endpoints. Django compiles name__istartswith to
+# UPPER(name) LIKE UPPER(%s), which these text_pattern_ops indexes answer
+# whatever the database collation.
+TABLES = ('image', 'video', 'preparation', 'product')
+
+CREATE_INDEXES = [
+    "CREATE INDEX whats_fresh_api_%s_name_prefix "
+    "ON whats_fresh_api_%s (UPPER(name) text_pattern_ops);" % (table, table)
+    for table in TABLES]
+
+DROP_INDEXES = [
+    "DROP INDEX IF EXISTS whats_fresh_api_%s_name_prefix;" % table
+    for table in TABLES]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('whats_fresh_api', '0005_vendor_location_index'),
+    ]
+
+    operations = [
+        migrations.RunSQL(create, drop)
+        for create, drop in zip(CREATE_INDEXES, DROP_INDEXES)
+    ]
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations
+
+# Full-text search vectors for */1/search*. Each table gets a search_vector
+# tsvector column, kept up to date by a trigger and indexed with GIN. The
+# columns are not model fields: they are only read, by whats_fresh_api.search.
+#
+# Fields are weighted A (names) to C (long descriptions), for ranking.
+SEARCH_FIELDS = {
+    'product': (('name', 'A'), ('alt_name', 'B'), ('variety', 'B'),
+                ('description', 'C')),
+    'vendor': (('name', 'A'), ('city', 'B'), ('description', 'C')),
+    'story': (('name', 'A'), ('products', 'B'), ('history', 'C'),
+              ('facts', 'C'), ('buying', 'C'), ('preparing', 'C'),
+              ('season', 'C')),
+}
+
+CREATE = """
+ALTER TABLE whats_fresh_api_{model} ADD COLUMN search_vector tsvector;
+
+CREATE FUNCTION whats_fresh_api_{model}_search_vector() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector := {vector};
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER whats_fresh_api_{model}_search_vector
+    BEFORE INSERT OR UPDATE ON whats_fresh_api_{model}
+    FOR EACH ROW EXECUTE PROCEDURE whats_fresh_api_{model}_search_vector();
+
+UPDATE whats_fresh_api_{model} SET id = id;
+
+CREATE INDEX whats_fresh_api_{model}_search
+    ON whats_fresh_api_{model} USING GIN (search_vector);
+"""
+
+DROP = """
+DROP TRIGGER IF EXISTS whats_fresh_api_{model}_search_vector
+    ON whats_fresh_api_{model};
+DROP FUNCTION IF EXISTS whats_fresh_api_{model}_search_vector();
+ALTER TABLE whats_fresh_api_{model} DROP COLUMN IF EXISTS search_vector;
+"""
+
+
+def vector(fields):
+    return ' || '.join(
+        "setweight(to_tsvector('pg_catalog.english', "
+        "coalesce(NEW.%s, '')), '%s')" % (field, weight)
+        for field, weight in fields)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('whats_fresh_api', '0006_name_prefix_indexes'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            CREATE.format(model=model, vector=vector(fields)),
+            DROP.format(model=model))
+        for model, fields in sorted(SEARCH_FIELDS.items())
+    ]
@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations
+
+# Vendor.city is filtered with city__iexact, which Django compiles to
+# UPPER(city) = UPPER(%s).
+CREATE_CITY_INDEX = """
+CREATE INDEX whats_fresh_api_vendor_city_upper
+    ON whats_fresh_api_vendor (UPPER(city));
+"""
+
+DROP_CITY_INDEX = "DROP INDEX IF EXISTS whats_fresh_api_vendor_city_upper;"
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('whats_fresh_api', '0007_search_vectors'),
+    ]
+
+    operations = [
+        migrations.AlterIndexTogether(
+            name='vendorproduct',
+            index_together=set([
+                ('product_preparation', 'available', 'vendor'),
+                ('vendor', 'product_preparation')]),
+        ),
+        migrations.RunSQL(CREATE_CITY_INDEX, DROP_CITY_INDEX),
+    ]
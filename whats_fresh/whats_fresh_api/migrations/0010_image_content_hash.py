@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import hashlib
+
+from django.db import models, migrations
+
+
+def hash_images(apps, schema_editor):
+    """
+    Record the content hash of the images uploaded so far, so that new
+    uploads are deduplicated against them too.
+    """
+    Image = apps.get_model('whats_fresh_api', 'Image')
+    for image in Image.objects.all():
+        file_hash = hashlib.sha256()
+        try:
+            image.image.open('rb')
+            for chunk in image.image.chunks():
+                file_hash.update(chunk)
+            image.image.close()
+        except (IOError, OSError):
+            # The file is missing; there is nothing to deduplicate
+            continue
+        Image.objects.filter(id=image.id).update(
+            content_hash=file_hash.hexdigest())
+
+
+def forget_hashes(apps, schema_editor):
+    pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('whats_fresh_api', '0009_image_renditions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='image',
+            name='content_hash',
+            field=models.CharField(default='', max_length=64, editable=False,
+                                   db_index=True, blank=True),
+            preserve_default=True,
+        ),
+        migrations.RunPython(hash_images, forget_hashes),
+    ]
@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+import whats_fresh.whats_fresh_api.uploads
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('whats_fresh_api', '0010_image_content_hash'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='image',
+            name='image',
+            field=models.ImageField(
+                upload_to=whats_fresh.whats_fresh_api.uploads.image_upload_to),
+            preserve_default=True,
+        ),
+    ]
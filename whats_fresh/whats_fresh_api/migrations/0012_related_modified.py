@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('whats_fresh_api', '0011_image_hashed_names'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='preparation',
+            name='modified',
+            field=models.DateTimeField(
+                default=django.utils.timezone.now, auto_now=True),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='productpreparation',
+            name='modified',
+            field=models.DateTimeField(
+                default=django.utils.timezone.now, auto_now=True),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='vendorproduct',
+            name='modified',
+            field=models.DateTimeField(
+                default=django.utils.timezone.now, auto_now=True),
+            preserve_default=False,
+        ),
+    ]
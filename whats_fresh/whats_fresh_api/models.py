@@ -1,6 +1,8 @@
 from django.contrib.gis.db import models
+import json
 import os
 from phonenumber_field.modelfields import PhoneNumberField
+from whats_fresh.whats_fresh_api.uploads import image_upload_to
 import whats_fresh.whats_fresh_api.signals  # NOQA
 
 
@@ -23,19 +25,35 @@ class Image(models.Model):
     def __unicode__(self):
         return self.name
 
-    image = models.ImageField(upload_to='images')
+    image = models.ImageField(upload_to=image_upload_to)
     name = models.TextField(default='')
     caption = models.TextField(blank=True)
+    # The file names of the scaled copies of the image, as JSON -- see
+    # renditions.py
+    renditions = models.TextField(blank=True, default='', editable=False)
+    # The SHA-256 of the image file, which identifies repeated uploads
+    content_hash = models.CharField(
+        max_length=64, blank=True, default='', db_index=True, editable=False)
 
     created = models.DateTimeField(auto_now_add=True)
     modified = models.DateTimeField(auto_now=True)
 
+    def rendition_urls(self):
+        storage = self.image.storage
+        return dict(
+            (rendition, dict(
+                (format, storage.url(name)) for format, name in files.items()))
+            for rendition, files in json.loads(self.renditions).items())
+
     def natural_key(self):
-        return {
+        key = {
             'name': self.name,
             'caption': self.caption,
             'link': self.image.url
         }
+        if self.renditions:
+            key['renditions'] = self.rendition_urls()
+        return key
 
 
 class Vendor(models.Model):
@@ -80,7 +98,7 @@ class Vendor(models.Model):
         blank=True)
 
     created = models.DateTimeField(auto_now_add=True)
-    modified = models.DateTimeField(auto_now=True)
+    modified = models.DateTimeField(auto_now=True, db_index=True)
 
 
 class Product(models.Model):
@@ -114,7 +132,7 @@ class Product(models.Model):
         'Preparation', related_name='products', through='ProductPreparation')
 
     created = models.DateTimeField(auto_now_add=True)
-    modified = models.DateTimeField(auto_now=True)
+    modified = models.DateTimeField(auto_now=True, db_index=True)
 
 
 class Story(models.Model):
@@ -139,7 +157,7 @@ class Story(models.Model):
     images = models.ManyToManyField('Image', null=True, blank=True)
     videos = models.ManyToManyField('Video', null=True, blank=True)
     created = models.DateTimeField(auto_now_add=True)
-    modified = models.DateTimeField(auto_now=True)
+    modified = models.DateTimeField(auto_now=True, db_index=True)
 
 
 class Preparation(models.Model):
@@ -159,6 +177,8 @@ class Preparation(models.Model):
     description = models.TextField(blank=True)
     additional_info = models.TextField(blank=True)
 
+    modified = models.DateTimeField(auto_now=True)
+
 
 class ProductPreparation(models.Model):
 
@@ -176,6 +196,8 @@ class ProductPreparation(models.Model):
     product = models.ForeignKey(Product)
     preparation = models.ForeignKey(Preparation)
 
+    modified = models.DateTimeField(auto_now=True)
+
 
 class VendorProduct(models.Model):
 
@@ -200,6 +222,15 @@ class VendorProduct(models.Model):
     vendor_price = models.TextField(blank=True)
     available = models.NullBooleanField()
 
+    modified = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        # For the vendor filters, and for reading a vendor's products
+        index_together = [
+            ('product_preparation', 'available', 'vendor'),
+            ('vendor', 'product_preparation'),
+        ]
+
 
 class Video(models.Model):
     """
@@ -229,3 +260,18 @@ class Video(models.Model):
             'name': self.name,
             'link': self.video
         }
+
+
+class Tombstone(models.Model):
+    """
+    A Tombstone records the deletion of a vendor, product or story, so that
+    clients syncing through */changes* can remove their copies. Tombstones
+    are created by a post_delete signal receiver.
+    """
+
+    def __unicode__(self):
+        return "Deleted %s %s" % (self.model, self.object_id)
+
+    model = models.TextField()
+    object_id = models.IntegerField()
+    deleted = models.DateTimeField(auto_now_add=True, db_index=True)
@@ -0,0 +1,153 @@
+import json
+import logging
+import os
+import threading
+from io import BytesIO
+from multiprocessing.pool import ThreadPool
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connection
+from django.utils import timezone
+from PIL import Image as PILImage
+
+from whats_fresh.whats_fresh_api import response_cache
+
+logger = logging.getLogger(__name__)
+
+# File extension and save() options of each rendition format
+FORMATS = {
+    'JPEG': ('jpg', {'quality': 85, 'optimize': True, 'progressive': True}),
+    'WEBP': ('webp', {'quality': 80}),
+}
+
+# Image modes each rendition format can be saved in; images in other modes
+# are converted to RGB
+FORMAT_MODES = {
+    'JPEG': ('RGB', 'L'),
+    'WEBP': ('RGB', 'RGBA'),
+}
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def supported_formats():
+    """
+    Return the IMAGE_RENDITION_FORMATS that this build of Pillow can write.
+    WebP support depends on the libraries Pillow was compiled against.
+    """
+    PILImage.init()
+    return [format for format in settings.IMAGE_RENDITION_FORMATS
+            if format in PILImage.SAVE]
+
+
+def rendition_name(name, rendition, format):
+    """
+    Return the file name of a rendition of the image file name, next to it:
+    images/cat.jpg becomes images/cat.thumbnail.jpg.
+    """
+    base, extension = os.path.splitext(name)
+    return '%s.%s.%s' % (base, rendition, FORMATS[format][0])
+
+
+def normalize_mode(image):
+    """
+    Return image in L, RGB or RGBA mode, which can be scaled smoothly and
+    saved in any of the FORMATS after at most a conversion to RGB. 16-bit
+    and floating point images are scaled down to 8-bit grayscale; images
+    in other modes (palette, CMYK...) become RGBA if they have transparency,
+    and RGB otherwise.
+    """
+    if image.mode in ('L', 'RGB', 'RGBA'):
+        return image
+    if image.mode in ('I', 'F') or image.mode.startswith('I;16'):
+        return image.convert('I').point(
+            lambda value: value * (1.0 / 256)).convert('L')
+    if image.mode in ('LA', 'PA') or 'transparency' in image.info:
+        return image.convert('RGBA')
+    return image.convert('RGB')
+
+
+def generate_renditions(storage, name):
+    """
+    Write the IMAGE_RENDITIONS of the image file name in storage, each
+    scaled to fit in a square of its size and saved in each supported
+    format. Returns {rendition: {format: file name}}.
+    """
+    with storage.open(name) as original:
+        source = PILImage.open(original)
+        # JPEGs are decoded at the smallest scale that still covers the
+        # largest rendition
+        largest = max(size for rendition, size in settings.IMAGE_RENDITIONS)
+        source.draft('RGB', (largest, largest))
+        source.load()
+    source = normalize_mode(source)
+
+    names = {}
+    for rendition, size in settings.IMAGE_RENDITIONS:
+        scaled = source.copy()
+        scaled.thumbnail((size, size), PILImage.ANTIALIAS)
+        names[rendition] = {}
+        for format in supported_formats():
+            image = scaled
+            if image.mode not in FORMAT_MODES[format]:
+                image = image.convert('RGB')
+            content = BytesIO()
+            image.save(content, format, **FORMATS[format][1])
+
+            path = rendition_name(name, rendition, format)
+            if storage.exists(path):
+                storage.delete(path)
+            names[rendition][format.lower()] = storage.save(
+                path, ContentFile(content.getvalue()))
+    return names
+
+
+def render_image(id):
+    """
+    Generate the renditions of Image id and record them on it. Nothing is
+    recorded if the image file was replaced in the meantime, as the
+    renditions of the new file are on their way.
+    """
+    from whats_fresh.whats_fresh_api.models import Image
+
+    try:
+        image = Image.objects.get(id=id)
+        names = generate_renditions(image.image.storage, image.image.name)
+        # update() sends no signals, so the response cache is invalidated
+        # here.
+        Image.objects.filter(id=id, image=image.image.name).update(
+            renditions=json.dumps(names), modified=timezone.now())
+        response_cache.invalidate()
+    except Exception:
+        logger.exception('Could not generate the renditions of image %s', id)
+
+
+def render_in_worker(id):
+    # Each worker thread has its own database connection; close it rather
+    # than leave it idle between uploads.
+    try:
+        render_image(id)
+    finally:
+        connection.close()
+
+
+def get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPool(settings.IMAGE_RENDITION_WORKERS)
+        return _pool
+
+
+def schedule(image):
+    """
+    Generate the renditions of image off the request thread, in a pool of
+    IMAGE_RENDITION_WORKERS threads. With no workers, they are generated
+    before returning.
+    """
+    if settings.IMAGE_RENDITION_WORKERS:
+        get_pool().apply_async(render_in_worker, (image.id,))
+    else:
+        render_image(image.id)
@@ -0,0 +1,165 @@
+from datetime import datetime
+from functools import wraps
+from hashlib import md5
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.utils.http import parse_etags, parse_http_date, urlencode
+from django.views.decorators.http import condition
+
+CACHE_ALIAS = 'api'
+
+GENERATION_KEY = 'whats-fresh:generation'
+HITS_KEY = 'whats-fresh:hits'
+MISSES_KEY = 'whats-fresh:misses'
+
+
+def get_cache():
+    """
+    Return the cache backend used for API responses, the 'api' entry of the
+    CACHES setting. Any Django cache backend can be used; the local-memory
+    and file based backends are the two supported ones.
+    """
+    return caches[CACHE_ALIAS]
+
+
+def get_generation():
+    """
+    Return the current cache generation. Every cache key includes it, so
+    changing the generation invalidates every cached response at once.
+    """
+    cache = get_cache()
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        cache.add(GENERATION_KEY, uuid4().hex, None)
+        generation = cache.get(GENERATION_KEY)
+    return generation
+
+
+def invalidate():
+    """
+    Invalidate every cached API response.
+    """
+    get_cache().set(GENERATION_KEY, uuid4().hex, None)
+
+
+def normalize_query(query):
+    """
+    Return the query string parameters in a canonical form, so that
+    ?lng=1&lat=2 and ?lat=2&lng=1 share a cache entry.
+    """
+    return urlencode(sorted(
+        (key, value.strip())
+        for key in query
+        for value in query.getlist(key)))
+
+
+def response_cache_key(request):
+    """
+    Build the cache key for a request from the cache generation, the path
+    and the normalized query string.
+    """
+    normalized = '%s?%s' % (request.path, normalize_query(request.GET))
+    return 'whats-fresh:response:%s:%s' % (
+        get_generation(), md5(normalized.encode('utf-8')).hexdigest())
+
+
+def count(key):
+    cache = get_cache()
+    try:
+        cache.incr(key)
+    except ValueError:
+        # The counter doesn't exist yet (or was evicted)
+        cache.add(key, 1, None)
+
+
+def cache_stats():
+    """
+    Return the hit and miss counters, for sizing the cache.
+    """
+    cache = get_cache()
+    hits = cache.get(HITS_KEY, 0)
+    misses = cache.get(MISSES_KEY, 0)
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'ratio': float(hits) / total if total else 0.0,
+        'generation': cache.get(GENERATION_KEY)
+    }
+
+
+def reset_stats():
+    get_cache().delete_many([HITS_KEY, MISSES_KEY])
+
+
+def validators(response):
+    """
+    Return the (ETag, Last-Modified time) of a response, as set by
+    conditional.conditional, or None for those it doesn't have.
+    """
+    etag = last_modified = None
+    if response.has_header('ETag'):
+        etag = parse_etags(response['ETag'])[0]
+    if response.has_header('Last-Modified'):
+        last_modified = datetime.utcfromtimestamp(
+            parse_http_date(response['Last-Modified']))
+    return etag, last_modified
+
+
+def cached_response(request, entry):
+    """
+    Return the response for a cache entry, or a 304 if the request's
+    If-None-Match or If-Modified-Since matches the validators stored with
+    it.
+    """
+    content, content_type, etag, last_modified = entry
+    response = HttpResponse(content, content_type=content_type)
+    response['X-Cache'] = 'HIT'
+
+    @condition(etag_func=lambda request: etag,
+               last_modified_func=lambda request: last_modified)
+    def view(request):
+        return response
+    return view(request)
+
+
+def cache_response(view):
+    """
+    Cache the successful GET responses of a public API view. Entries are
+    keyed on the path and normalized query string, and are invalidated by
+    the model signal receivers in signals.py whenever API data changes.
+
+    The ETag and Last-Modified headers of a response are stored with it, so
+    that conditional requests answered from the cache need no database
+    query; conditional.conditional must therefore be applied below this
+    decorator, and is only run on cache misses.
+
+    Setting API_CACHE_ENABLED to False turns the cache off.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if (request.method != 'GET' or
+                not getattr(settings, 'API_CACHE_ENABLED', True)):
+            return view(request, *args, **kwargs)
+
+        cache = get_cache()
+        # The key is built before the view runs, so a response rendered
+        # while the data changes is stored under the old generation and
+        # never served.
+        key = response_cache_key(request)
+        cached = cache.get(key)
+        if cached is not None:
+            count(HITS_KEY)
+            return cached_response(request, cached)
+
+        count(MISSES_KEY)
+        response = view(request, *args, **kwargs)
+        if response.status_code == 200 and not response.streaming:
+            cache.set(key, (response.content, response['Content-Type']) +
+                      validators(response))
+        response['X-Cache'] = 'MISS'
+        return response
+    return wrapper
@@ -0,0 +1,61 @@
+from functools import reduce
+from operator import and_, or_
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+
+# The text fields searched for each model. On PostgreSQL they are searched
+# through the search_vector columns added by migration 0007, which weight
+# them the same way; elsewhere, or with API_FULL_TEXT_SEARCH off, through
+# case-insensitive substring matches.
+SEARCH_FIELDS = {
+    'product': ('name', 'alt_name', 'variety', 'description'),
+    'vendor': ('name', 'city', 'description'),
+    'story': ('name', 'products', 'history', 'facts', 'buying', 'preparing',
+              'season'),
+}
+
+TSQUERY = "plainto_tsquery('pg_catalog.english', %s)"
+
+
+def full_text_search(queryset, query):
+    """
+    Return the objects of queryset whose search vector matches query, with
+    their rank as search_rank, best first.
+    """
+    table = queryset.model._meta.db_table
+    return queryset.extra(
+        select={'search_rank': 'ts_rank("%s"."search_vector", %s)' % (
+            table, TSQUERY)},
+        select_params=[query],
+        where=['"%s"."search_vector" @@ %s' % (table, TSQUERY)],
+        params=[query],
+        order_by=['-search_rank', 'id'])
+
+
+def substring_search(queryset, query):
+    """
+    Return the objects of queryset which contain every word of query in one
+    of their search fields, in id order.
+    """
+    fields = SEARCH_FIELDS[queryset.model._meta.model_name]
+    words = query.split()
+    if not words:
+        return queryset.none()
+    return queryset.filter(reduce(and_, [
+        reduce(or_, [Q(**{'%s__icontains' % field: word})
+                     for field in fields])
+        for word in words])).order_by('id')
+
+
+def search(queryset, query):
+    """
+    Search the products, vendors or stories in queryset for query, using
+    PostgreSQL full-text search if it is available and turned on with the
+    API_FULL_TEXT_SEARCH setting.
+    """
+    if (getattr(settings, 'API_FULL_TEXT_SEARCH', True) and
+            connection.vendor == 'postgresql'):
+        return full_text_search(queryset, query)
+    return substring_search(queryset, query)
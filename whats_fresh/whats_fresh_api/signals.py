@@ -1,6 +1,33 @@
-from django.db.models.signals import post_save
+from django.conf import settings
+from django.core.signals import request_started
+from django.db import connections
+from django.db.models.signals import post_save, post_delete, m2m_changed
 from django.dispatch import receiver
 from django.contrib.auth.models import User, Group
+from django.utils import timezone
+
+from whats_fresh.whats_fresh_api import response_cache
+
+# Models whose changes are visible through the public API. They are matched
+# by name because this module is imported before the models are defined.
+API_MODELS = ('vendor', 'product', 'story', 'preparation', 'vendorproduct',
+              'productpreparation', 'image', 'video')
+
+# Models whose deletions are recorded as tombstones for */changes*
+TOMBSTONE_MODELS = ('vendor', 'product', 'story')
+
+# Models named in the products of a vendor, and the lookup from Vendor to
+# them
+VENDOR_PRODUCT_LOOKUPS = {
+    'product': 'vendorproduct__product_preparation__product',
+    'preparation': 'vendorproduct__product_preparation__preparation',
+    'productpreparation': 'vendorproduct__product_preparation',
+}
+
+
+def is_api_model(model):
+    return (model._meta.app_label == 'whats_fresh_api' and
+            model._meta.model_name in API_MODELS)
 
 
 @receiver(post_save, sender=User)
@@ -12,3 +39,64 @@ def default_group_callback(sender, instance, *args, **kwargs):
         instance.groups.add(group)
         instance.save()
         return
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def invalidate_response_cache(sender, *args, **kwargs):
+    if is_api_model(sender):
+        response_cache.invalidate()
+
+
+@receiver(post_delete)
+def record_tombstone(sender, instance, *args, **kwargs):
+    if (sender._meta.app_label == 'whats_fresh_api' and
+            sender._meta.model_name in TOMBSTONE_MODELS):
+        from whats_fresh.whats_fresh_api.models import Tombstone
+        Tombstone.objects.create(
+            model=sender._meta.model_name, object_id=instance.id)
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def touch_vendors(sender, instance, raw=False, *args, **kwargs):
+    # The products of a vendor are part of the vendor in the API, so a
+    # change to them modifies the vendor, and */changes* sends it again.
+    # Fixtures are loaded with their own modified times.
+    if raw or sender._meta.app_label != 'whats_fresh_api':
+        return
+    from whats_fresh.whats_fresh_api.models import Vendor
+    model_name = sender._meta.model_name
+    if model_name == 'vendorproduct':
+        # A deleted vendor product can't be joined to its vendor; deleting
+        # a product or preparation deletes its vendor products too.
+        vendors = Vendor.objects.filter(id=instance.vendor_id)
+    elif model_name in VENDOR_PRODUCT_LOOKUPS:
+        vendors = Vendor.objects.filter(
+            **{VENDOR_PRODUCT_LOOKUPS[model_name]: instance.id})
+    else:
+        return
+    # update() sends no signals, so this doesn't run again for the vendors
+    vendors.update(modified=timezone.now())
+
+
+@receiver(m2m_changed)
+def invalidate_response_cache_m2m(sender, instance, action, *args, **kwargs):
+    # Story images and videos are changed through their relation managers,
+    # which send m2m_changed rather than post_save.
+    if action.startswith('post_') and is_api_model(type(instance)):
+        response_cache.invalidate()
+
+
+@receiver(request_started)
+def check_database_connections(sender, **kwargs):
+    # A persistent connection may have been broken while it was idle, by a
+    # database restart or a pooler dropping it. Close it, so that the
+    # request opens a new connection rather than failing on its first query.
+    if not settings.DATABASE_HEALTH_CHECKS:
+        return
+    for connection in connections.all():
+        if (connection.connection is not None and
+                not connection.in_atomic_block and
+                not connection.is_usable()):
+            connection.close()
@@ -0,0 +1,17 @@
+// Fill the <select> next to a search box with the objects whose names start
+// with what has been typed, fetched from the search URL in the box's
+// data-url attribute.
+function searchOptions(input)
+{
+    var select = $( input ).siblings( "select" );
+    clearTimeout(input.search_timer);
+    input.search_timer = setTimeout(function() {
+        $.getJSON($( input ).data( "url" ), { q: input.value }, function( data ) {
+            select.empty();
+            select.append($( "<option selected disabled>" ));
+            $.each(data.results, function( index, result ) {
+                select.append($( "<option>" ).val( result.id ).text( result.name ));
+            });
+        });
+    }, 200);
+}
@@ -0,0 +1,63 @@
+from django.test import TestCase
+from django.core.exceptions import ImproperlyConfigured
+from mock import Mock, patch
+from whats_fresh.database import configure_databases
+from whats_fresh.whats_fresh_api.signals import check_database_connections
+
+
+class DatabaseConnectionsTestCase(TestCase):
+    """
+    Test the database connection settings and health checks.
+
+    Things tested:
+        Connections are persistent by default
+        A database's own CONN_MAX_AGE is kept
+        Behind a session pooler, connections are closed after each request
+        Behind a transaction pooler, connections are kept open
+        Broken connections are closed at the start of a request
+    """
+
+    def databases(self, **default):
+        return {'default': dict(default, NAME='whats_fresh')}
+
+    def test_persistent(self):
+        databases = configure_databases(self.databases(), 60)
+        self.assertEqual(databases['default']['CONN_MAX_AGE'], 60)
+
+        databases = configure_databases(self.databases(CONN_MAX_AGE=5), 60)
+        self.assertEqual(databases['default']['CONN_MAX_AGE'], 5)
+
+    def test_session_pooler(self):
+        databases = configure_databases(self.databases(), 60, 'session')
+        self.assertEqual(databases['default']['CONN_MAX_AGE'], 0)
+
+    def test_transaction_pooler(self):
+        databases = configure_databases(self.databases(), None, 'transaction')
+        self.assertEqual(databases['default']['CONN_MAX_AGE'], None)
+
+    def test_unknown_pooler(self):
+        self.assertRaises(ImproperlyConfigured, configure_databases,
+                          self.databases(), 60, 'statement')
+
+    def connection(self, usable):
+        return Mock(connection=object(), in_atomic_block=False,
+                    is_usable=Mock(return_value=usable))
+
+    def test_health_check(self):
+        broken, working = self.connection(False), self.connection(True)
+        with patch('whats_fresh.whats_fresh_api.signals.connections') as c:
+            c.all.return_value = [broken, working]
+            check_database_connections(sender=None)
+
+        broken.close.assert_called_once_with()
+        self.assertFalse(working.close.called)
+
+    def test_health_check_off(self):
+        broken = self.connection(False)
+        with patch('whats_fresh.whats_fresh_api.signals.connections') as c:
+            c.all.return_value = [broken]
+            with self.settings(DATABASE_HEALTH_CHECKS=False):
+                check_database_connections(sender=None)
+
+        self.assertFalse(broken.is_usable.called)
+        self.assertFalse(broken.close.called)
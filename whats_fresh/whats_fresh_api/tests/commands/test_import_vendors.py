@@ -0,0 +1,103 @@
+from django.test import TestCase
+from django.test.utils import override_settings
+from django.core.management import call_command
+from whats_fresh.whats_fresh_api.models import Vendor
+
+from StringIO import StringIO
+import json
+import os
+import shutil
+import tempfile
+
+GAZETTEER = os.path.join(os.path.dirname(__file__), '..', 'testdata',
+                         'gazetteer.csv')
+
+CSV_VENDORS = """name,description,street,city,state,zip,contact_name,\
+preparation_ids,lat,lng
+Dockside Fish,Fresh fish,750 NW Lighthouse Dr,Newport,OR,97365,Ann,"1,2",,
+Harbor Crab,Crab,1 Bay Blvd,Newport,OR,97365,Bob,3,44.62,-124.05
+No Products,Nothing,2 Bay Blvd,Newport,OR,97365,Cy,,44.62,-124.05
+Lost Boat,Fish,1 Nowhere St,Newport,OR,97365,Di,1,,
+"""
+
+
+@override_settings(
+    GEOCODER_GAZETTEER=GAZETTEER,
+    GEOCODER_BACKENDS=(
+        'whats_fresh.whats_fresh_api.geocoding.GazetteerGeocoder',))
+class ImportVendorsTestCase(TestCase):
+    """
+    Test the import_vendors management command.
+
+    Things tested:
+        Vendors and their products are created from CSV and JSON lines files
+        Addresses are geocoded, unless lat and lng are given
+        Rows that can't be imported are reported, and the rest imported
+        Running an import again does not duplicate vendors
+    """
+    fixtures = ['test_fixtures']
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write(self, name, content):
+        path = os.path.join(self.directory, name)
+        with open(path, 'w') as vendor_file:
+            vendor_file.write(content)
+        return path
+
+    def import_vendors(self, path, **options):
+        stdout, stderr = StringIO(), StringIO()
+        call_command('import_vendors', path, stdout=stdout, stderr=stderr,
+                     batch_size=2, **options)
+        return stdout.getvalue(), stderr.getvalue()
+
+    def test_csv(self):
+        stdout, stderr = self.import_vendors(
+            self.write('vendors.csv', CSV_VENDORS))
+
+        dockside = Vendor.objects.get(name='Dockside Fish')
+        self.assertEqual(dockside.location.y, 44.6752643)
+        self.assertEqual(dockside.location.x, -124.072162)
+        self.assertEqual(sorted(
+            dockside.vendorproduct_set.values_list(
+                'product_preparation_id', flat=True)), [1, 2])
+
+        crab = Vendor.objects.get(name='Harbor Crab')
+        self.assertEqual(crab.location.y, 44.62)
+        self.assertEqual(list(crab.vendorproduct_set.values_list(
+            'product_preparation_id', flat=True)), [3])
+
+        self.assertIn('Row 3: preparation_ids', stderr)
+        self.assertIn('Row 4: Full address is required.', stderr)
+        self.assertIn('Done: 2 imported, 0 already existed, 2 failed.',
+                      stdout)
+        self.assertEqual(Vendor.objects.count(), 4)
+
+    def test_jsonl(self):
+        vendors = [
+            {'name': 'Harbor Crab', 'description': 'Crab',
+             'street': '1 Bay Blvd', 'city': 'Newport', 'state': 'OR',
+             'zip': '97365', 'contact_name': 'Bob', 'preparation_ids': '3',
+             'lat': 44.62, 'lng': -124.05},
+            {'name': 'Bad Prep', 'description': 'Crab',
+             'street': '1 Bay Blvd', 'city': 'Newport', 'state': 'OR',
+             'zip': '97365', 'contact_name': 'Bob', 'preparation_ids': '99',
+             'lat': 44.62, 'lng': -124.05}]
+        stdout, stderr = self.import_vendors(self.write(
+            'vendors.jsonl', '\n'.join(json.dumps(v) for v in vendors)))
+
+        self.assertTrue(Vendor.objects.filter(name='Harbor Crab').exists())
+        self.assertIn('Unknown product preparation 99.', stderr)
+
+    def test_resume(self):
+        path = self.write('vendors.csv', CSV_VENDORS)
+        self.import_vendors(path)
+        stdout, stderr = self.import_vendors(path)
+
+        self.assertIn('Done: 0 imported, 2 already existed, 2 failed.',
+                      stdout)
+        self.assertEqual(Vendor.objects.count(), 4)
@@ -0,0 +1,64 @@
+from django.test import TestCase
+from django.db import connection
+from django.core.management.base import CommandError
+from mock import Mock, patch
+from whats_fresh.whats_fresh_api.management.commands.serve import (
+    gunicorn_options, post_worker_init, Server)
+from whats_fresh.whats_fresh_api.views.vendor import vendor_list
+from whats_fresh.whats_fresh_api.warmup import warm_up
+
+
+class ServeTestCase(TestCase):
+    """
+    Test the serve management command and the worker warm-up.
+
+    Things tested:
+        gunicorn is configured from the WSGI_* settings
+        Command line options override the settings
+        Warming up imports the views and connects to the database
+        Threaded workers don't connect while warming up
+    """
+
+    def test_settings(self):
+        with self.settings(WSGI_BIND='0.0.0.0:8080', WSGI_WORKERS=3,
+                           WSGI_THREADS=2, WSGI_MAX_REQUESTS=500,
+                           WSGI_PIDFILE='/tmp/whats_fresh.pid'):
+            options = gunicorn_options()
+
+        self.assertEqual(options['bind'], ['0.0.0.0:8080'])
+        self.assertEqual(options['workers'], 3)
+        self.assertEqual(options['threads'], 2)
+        self.assertEqual(options['max_requests'], 500)
+        self.assertEqual(options['pidfile'], '/tmp/whats_fresh.pid')
+
+    def test_overrides(self):
+        with self.settings(WSGI_PIDFILE=None):
+            options = gunicorn_options(bind='unix:/tmp/whats_fresh.sock',
+                                       workers=8)
+        self.assertEqual(options['bind'], ['unix:/tmp/whats_fresh.sock'])
+        self.assertEqual(options['workers'], 8)
+        self.assertNotIn('pidfile', options)
+
+    def test_no_workers(self):
+        self.assertRaises(CommandError, gunicorn_options, workers=0)
+        self.assertRaises(CommandError, gunicorn_options, threads=0)
+
+    def test_server_config(self):
+        server = Server(gunicorn_options(workers=2, threads=4))
+        self.assertEqual(server.cfg.workers, 2)
+        self.assertEqual(server.cfg.threads, 4)
+        self.assertEqual(server.load().__class__.__name__, 'WSGIHandler')
+
+    def test_warm_up(self):
+        views = warm_up()
+        self.assertIn(vendor_list, views)
+        self.assertIsNotNone(connection.connection)
+
+    @patch('whats_fresh.whats_fresh_api.management.commands.serve.warm_up')
+    def test_threaded_warm_up(self, serve_warm_up):
+        post_worker_init(Mock(cfg=Mock(threads=1)))
+        serve_warm_up.assert_called_once_with(connect=True)
+
+        serve_warm_up.reset_mock()
+        post_worker_init(Mock(cfg=Mock(threads=4)))
+        serve_warm_up.assert_called_once_with(connect=False)
@@ -1,6 +1,7 @@
 from django.test import TestCase
 from django.core.urlresolvers import reverse
-from whats_fresh.whats_fresh_api.models import Product, Image, Story
+from whats_fresh.whats_fresh_api.models import (Product, Image, Story,
+                                                ProductPreparation)
 from django.contrib.auth.models import User, Group
 
 
@@ -16,6 +17,8 @@ class EditProductTestCase(TestCase):
             object with the specified ID
         POSTing data with all fields missing (hitting "save" without entering
             data) returns the same field with notations of missing fields
+        Unchanged preparations keep their product preparations
+        Unknown preparations are reported as errors
     """
     fixtures = ['test_fixtures']
 
@@ -115,3 +118,30 @@ Star-Trek-Deep-Space-Nine/dp/B00008KA57/",
         response = self.client.delete(
             reverse('edit-product', kwargs={'id': '2'}))
         self.assertEqual(response.status_code, 404)
+
+    def post_preparations(self, preparation_ids):
+        product = {'name': 'Salmon', 'variety': 'Pacific', 'story': 1,
+                   'alt_name': '', 'origin': '', 'description': 'Salmon',
+                   'season': 'Always', 'available': '', 'image': 1,
+                   'market_price': '$3 a pack',
+                   'preparation_ids': preparation_ids, 'link': ''}
+        return self.client.post(
+            reverse('edit-product', kwargs={'id': '1'}), product)
+
+    def test_unchanged_preparations_kept(self):
+        before = sorted(ProductPreparation.objects.filter(
+            product_id=1).values_list('id', flat=True))
+
+        self.post_preparations('1,2')
+
+        after = sorted(ProductPreparation.objects.filter(
+            product_id=1).values_list('id', flat=True))
+        self.assertEqual(before, after)
+
+    def test_unknown_preparation(self):
+        response = self.post_preparations('1,99')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Unknown preparation 99.', response.context['errors'])
+        self.assertEqual(sorted(ProductPreparation.objects.filter(
+            product_id=1).values_list('preparation_id', flat=True)), [1, 2])
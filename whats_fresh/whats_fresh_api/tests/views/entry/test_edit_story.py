@@ -14,6 +14,7 @@ class EditStoryTestCase(TestCase):
         The outputted page has the correct form fields
         POSTing "correct" data will result in the update of the story
             object with the specified ID
+        Unknown images and videos are reported as errors
     """
     fixtures = ['test_fixtures']
 
@@ -70,6 +71,29 @@ class EditStoryTestCase(TestCase):
         videos = ([video.id for video in story.videos.all()])
         self.assertEqual(sorted(videos), [2])
 
+    def test_unknown_media(self):
+        """
+        POST images and videos which don't exist, and check that they are
+        reported and the story's media are unchanged
+        """
+        story = {'name': 'To The Moon!', 'history': '', 'facts': '',
+                 'buying': '', 'preparing': '', 'products': '',
+                 'season': '', 'image_ids': '1,99', 'video_ids': '98'}
+
+        response = self.client.post(
+            reverse('edit-story', kwargs={'id': '1'}), story)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Unknown image 99.', response.context['errors'])
+        self.assertIn('Unknown video 98.', response.context['errors'])
+
+        story = Story.objects.get(id=1)
+        self.assertEqual(story.name, 'Star Wars')
+        self.assertEqual(
+            list(story.images.values_list('id', flat=True)), [1])
+        self.assertEqual(
+            list(story.videos.values_list('id', flat=True)), [1])
+
     def test_form_fields(self):
         """
         Tests to see if the form contains all of the right fields
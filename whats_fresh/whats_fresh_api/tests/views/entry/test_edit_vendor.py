@@ -1,6 +1,6 @@
 from django.test import TestCase
 from django.core.urlresolvers import reverse
-from whats_fresh.whats_fresh_api.models import Vendor, Story
+from whats_fresh.whats_fresh_api.models import Vendor, Story, VendorProduct
 from django.contrib.auth.models import User, Group
 
 
@@ -16,6 +16,8 @@ class EditVendorTestCase(TestCase):
             object with the specified ID
         POSTing data with all fields missing (hitting "save" without entering
             data) returns the same field with notations of missing fields
+        Updating the products of a vendor keeps its unchanged products
+        Unknown product preparations are reported as errors
     """
     fixtures = ['test_fixtures']
 
@@ -132,3 +134,48 @@ class EditVendorTestCase(TestCase):
         response = self.client.delete(
             reverse('edit-vendor', kwargs={'id': '2'}))
         self.assertEqual(response.status_code, 404)
+
+    def test_unchanged_products_kept(self):
+        """
+        POST a vendor with one of its two products, and one new product, and
+        check that only the removed and added products change.
+        """
+        vendor = {
+            'zip': '94965', 'website': '', 'hours': '',
+            'street': '1633 Sommerville Rd', 'story': 1,
+            'status': '', 'state': 'CA', 'preparation_ids': '1,2',
+            'phone': '', 'name': 'Test Name',
+            'location_description': '', 'email': '',
+            'description': 'Test Description',
+            'contact_name': 'Test Contact', 'city': 'Sausalito'}
+
+        self.client.post(reverse('edit-vendor', kwargs={'id': '1'}), vendor)
+
+        vendor_products = VendorProduct.objects.filter(vendor_id=1)
+        self.assertEqual(sorted(vendor_products.values_list(
+            'product_preparation_id', flat=True)), [1, 2])
+
+        # The existing link is kept, with its price
+        kept = VendorProduct.objects.get(id=1)
+        self.assertEqual(kept.product_preparation_id, 1)
+        self.assertEqual(kept.vendor_price, '$12 per dozen')
+        self.assertFalse(VendorProduct.objects.filter(id=3).exists())
+
+    def test_unknown_preparation(self):
+        vendor = {
+            'zip': '94965', 'website': '', 'hours': '',
+            'street': '1633 Sommerville Rd', 'story': 1,
+            'status': '', 'state': 'CA', 'preparation_ids': '1,99',
+            'phone': '', 'name': 'Test Name',
+            'location_description': '', 'email': '',
+            'description': 'Test Description',
+            'contact_name': 'Test Contact', 'city': 'Sausalito'}
+
+        response = self.client.post(
+            reverse('edit-vendor', kwargs={'id': '1'}), vendor)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Unknown preparation 99.', response.context['errors'])
+        self.assertEqual(sorted(VendorProduct.objects.filter(
+            vendor_id=1).values_list('product_preparation_id', flat=True)),
+            [1, 3])
@@ -0,0 +1,117 @@
+from django.test import TestCase
+from django.core.urlresolvers import reverse
+from django.core.files.storage import FileSystemStorage
+from whats_fresh.whats_fresh_api.models import Image
+from whats_fresh.whats_fresh_api.renditions import (generate_renditions,
+                                                    supported_formats)
+from django.contrib.auth.models import User, Group
+from PIL import Image as PILImage
+
+import json
+import os
+import shutil
+import tempfile
+
+
+class ImageRenditionsTestCase(TestCase):
+
+    """
+    Test the scaled renditions of uploaded images.
+
+    Things tested:
+        Each rendition fits its size, in each format
+        Renditions are stored next to the original
+        Uploading an image generates its renditions
+        Palette and CMYK images get every rendition in every format
+        The rendition URLs are in the image's natural key
+        Images without renditions only have a link
+    """
+    fixtures = ['test_fixtures']
+
+    def setUp(self):
+        user = User.objects.create_user(
+            'temporary', 'temporary@gmail.com', 'temporary')
+        user.save()
+
+        admin_group = Group(name='Administration Users')
+        admin_group.save()
+        user.groups.add(admin_group)
+
+        response = self.client.login(
+            username='temporary', password='temporary')
+        self.assertEqual(response, True)
+
+        self.test_media_directory = os.path.abspath(os.path.join(
+            os.path.dirname(__file__), '..', '..', 'testdata', 'media'))
+
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_generate_renditions(self):
+        storage = FileSystemStorage(location=self.directory)
+        os.mkdir(os.path.join(self.directory, 'images'))
+        shutil.copy(os.path.join(self.test_media_directory, 'cat.jpg'),
+                    os.path.join(self.directory, 'images'))
+
+        with self.settings(IMAGE_RENDITIONS=(('thumbnail', 50),
+                                             ('medium', 100))):
+            names = generate_renditions(storage, 'images/cat.jpg')
+
+        self.assertEqual(sorted(names), ['medium', 'thumbnail'])
+        self.assertEqual(names['thumbnail']['jpeg'],
+                         'images/cat.thumbnail.jpg')
+        for rendition, size in (('thumbnail', 50), ('medium', 100)):
+            for format, name in names[rendition].items():
+                scaled = PILImage.open(storage.path(name))
+                self.assertEqual(scaled.format.lower(), format)
+                self.assertLessEqual(max(scaled.size), size)
+
+    def test_upload(self):
+        Image.objects.all().delete()
+
+        with open(os.path.join(self.test_media_directory, 'cat.jpg'),
+                  'rb') as cat:
+            self.client.post(reverse('new-image'), {
+                'name': 'A cat', 'caption': 'Catption', 'image': cat})
+
+        image = Image.objects.get()
+        urls = image.natural_key()['renditions']
+        self.assertEqual(sorted(urls), ['large', 'medium', 'thumbnail'])
+        self.assertIn('/media/images/cat', urls['thumbnail']['jpeg'])
+        self.assertIn('.thumbnail.jpg', urls['thumbnail']['jpeg'])
+        self.assertIn('.large.jpg', urls['large']['jpeg'])
+
+    def upload_converted(self, mode, format, name, **options):
+        """
+        Upload the test cat converted to mode and saved as format, and check
+        that the new image has every rendition in every supported format.
+        """
+        Image.objects.all().delete()
+        path = os.path.join(self.directory, name)
+        with open(os.path.join(self.test_media_directory, 'cat.jpg'),
+                  'rb') as cat:
+            PILImage.open(cat).convert(mode).save(path, format, **options)
+
+        with open(path, 'rb') as upload:
+            self.client.post(reverse('new-image'), {
+                'name': 'A cat', 'caption': 'Catption', 'image': upload})
+
+        image = Image.objects.get()
+        names = json.loads(image.renditions)
+        for rendition in ('thumbnail', 'medium', 'large'):
+            for format in supported_formats():
+                self.assertTrue(image.image.storage.exists(
+                    names[rendition][format.lower()]))
+
+    def test_palette_upload(self):
+        self.upload_converted('P', 'PNG', 'palette.png', transparency=0)
+
+    def test_cmyk_upload(self):
+        self.upload_converted('CMYK', 'JPEG', 'cmyk.jpg')
+
+    def test_no_renditions(self):
+        image = Image.objects.get(id=1)
+        self.assertEqual(sorted(image.natural_key()),
+                         ['caption', 'link', 'name'])
@@ -0,0 +1,74 @@
+from django.test import TestCase
+from django.core.urlresolvers import reverse
+from whats_fresh.whats_fresh_api.models import Image
+from django.contrib.auth.models import User, Group
+
+import hashlib
+import os
+
+
+class ImageUploadsTestCase(TestCase):
+
+    """
+    Test how uploaded images are stored.
+
+    Things tested:
+        Uploads are hashed while they are received
+        An image uploaded twice is stored once, and shares its renditions
+        A duplicate of an image without renditions yet gets its own
+        Images with too many pixels are refused
+    """
+
+    def setUp(self):
+        user = User.objects.create_user(
+            'temporary', 'temporary@gmail.com', 'temporary')
+        user.save()
+
+        admin_group = Group(name='Administration Users')
+        admin_group.save()
+        user.groups.add(admin_group)
+
+        response = self.client.login(
+            username='temporary', password='temporary')
+        self.assertEqual(response, True)
+
+        self.cat_path = os.path.abspath(os.path.join(
+            os.path.dirname(__file__), '..', '..', 'testdata', 'media',
+            'cat.jpg'))
+
+    def upload(self, name):
+        with open(self.cat_path, 'rb') as cat:
+            return self.client.post(reverse('new-image'), {
+                'name': name, 'caption': 'Catption', 'image': cat})
+
+    def test_content_hash(self):
+        self.upload('A cat')
+
+        with open(self.cat_path, 'rb') as cat:
+            expected = hashlib.sha256(cat.read()).hexdigest()
+        self.assertEqual(Image.objects.get().content_hash, expected)
+
+    def test_duplicate(self):
+        self.upload('A cat')
+        self.upload('The same cat')
+
+        first = Image.objects.get(name='A cat')
+        second = Image.objects.get(name='The same cat')
+        self.assertEqual(first.image.name, second.image.name)
+        self.assertEqual(first.renditions, second.renditions)
+
+    def test_duplicate_pending_renditions(self):
+        with self.settings(IMAGE_RENDITION_WORKERS=0):
+            self.upload('A cat')
+            Image.objects.update(renditions='')
+            self.upload('The same cat')
+
+        second = Image.objects.get(name='The same cat')
+        self.assertNotEqual(second.renditions, '')
+
+    def test_too_many_pixels(self):
+        with self.settings(IMAGE_MAX_PIXELS=100):
+            response = self.upload('A cat')
+
+        self.assertIn('image', response.context['image_form'].errors)
+        self.assertFalse(Image.objects.exists())
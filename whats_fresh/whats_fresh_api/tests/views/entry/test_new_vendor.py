@@ -13,6 +13,7 @@ class NewVendorTestCase(TestCase):
     Things tested:
         URLs reverse correctly
         The outputted page has the correct form fields
+        Products are picked through the product preparation search
         POSTing "correct" data will result in the creation of a new
             object with the specified details
         POSTing data with all fields missing (hitting "save" without entering
@@ -66,6 +67,15 @@ class NewVendorTestCase(TestCase):
             # form[field].value
             self.assertIn(fields[field], str(form[field]))
 
+    def test_product_search(self):
+        """
+        The product picker searches product preparations as the user types,
+        instead of loading every product with the page.
+        """
+        response = self.client.get(reverse('new-vendor'))
+        self.assertContains(
+            response, 'data-url="%s"' % reverse('search-product-preparations'))
+
     def test_successful_vendor_creation(self):
         """
         POST a proper "new vendor" command to the server, and see if the
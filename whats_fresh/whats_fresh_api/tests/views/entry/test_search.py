@@ -0,0 +1,85 @@
+from django.test import TestCase
+from django.test.utils import override_settings
+from django.core.urlresolvers import reverse
+from django.contrib.auth.models import User, Group
+
+import json
+
+
+class SearchTestCase(TestCase):
+
+    """
+    Test the entry interface's typeahead search endpoints.
+
+    Things tested:
+        URLs reverse correctly
+        Objects whose names start with q are returned, ignoring case
+        Results are paged
+        Users who aren't logged in are redirected
+    """
+    fixtures = ['test_fixtures']
+
+    def setUp(self):
+        user = User.objects.create_user(
+            'temporary', 'temporary@gmail.com', 'temporary')
+        admin_group = Group(name='Administration Users')
+        admin_group.save()
+        user.groups.add(admin_group)
+        self.client.login(username='temporary', password='temporary')
+
+    def search(self, name, **params):
+        response = self.client.get(reverse(name), params)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        return json.loads(response.content)
+
+    def test_url_endpoints(self):
+        self.assertEqual(reverse('search-images'), '/entry/search/images')
+        self.assertEqual(reverse('search-videos'), '/entry/search/videos')
+        self.assertEqual(
+            reverse('search-preparations'), '/entry/search/preparations')
+        self.assertEqual(
+            reverse('search-product-preparations'),
+            '/entry/search/product-preparations')
+
+    def test_not_logged_in(self):
+        self.client.logout()
+        response = self.client.get(reverse('search-images'))
+        self.assertRedirects(response, '/login?next=/entry/search/images')
+
+    def test_images(self):
+        data = self.search('search-images', q='a')
+        self.assertEqual(data['results'], [
+            {'id': 2, 'name': 'A cat'}, {'id': 1, 'name': 'A dog'}])
+        self.assertIsNone(data['next'])
+
+        data = self.search('search-images', q='a C')
+        self.assertEqual(data['results'], [{'id': 2, 'name': 'A cat'}])
+
+    def test_videos(self):
+        data = self.search('search-videos', q='prin')
+        self.assertEqual(data['results'], [{'id': 2, 'name': 'Princely'}])
+
+    def test_preparations(self):
+        data = self.search('search-preparations', q='F')
+        self.assertEqual(data['results'], [{'id': 2, 'name': 'Filet'}])
+
+        data = self.search('search-preparations', q='x')
+        self.assertEqual(data['results'], [])
+
+    def test_product_preparations(self):
+        data = self.search('search-product-preparations', q='ezri')
+        self.assertEqual(data['results'], [
+            {'id': 2, 'product': 'Ezri Dax', 'preparation': 'Filet',
+             'name': 'Ezri Dax (Filet)'},
+            {'id': 3, 'product': 'Ezri Dax', 'preparation': 'Live',
+             'name': 'Ezri Dax (Live)'}])
+
+    @override_settings(PAGE_LENGTH=1)
+    def test_pages(self):
+        data = self.search('search-images', q='a')
+        self.assertEqual(data['results'], [{'id': 2, 'name': 'A cat'}])
+        self.assertEqual(data['next'], 2)
+
+        data = self.search('search-images', q='a', page=data['next'])
+        self.assertEqual(data['results'], [{'id': 1, 'name': 'A dog'}])
+        self.assertIsNone(data['next'])
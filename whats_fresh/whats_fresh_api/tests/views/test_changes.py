@@ -0,0 +1,125 @@
+from django.test import TestCase
+from django.test.utils import override_settings
+from django.core.urlresolvers import reverse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from whats_fresh.whats_fresh_api.models import Vendor, Product, Story
+from whats_fresh.whats_fresh_api.functions import encode_cursor
+
+from datetime import timedelta
+import json
+
+
+@override_settings(API_CHANGES_LAG=0)
+class ChangesTestCase(TestCase):
+    """
+    Test the */changes* delta sync endpoint.
+
+    Things tested:
+        Without since, every record is returned
+        With since, only records modified after it are returned
+        Deleted vendors, products and stories are returned as ids
+        Vendors are returned when their products are changed
+        Large change sets are paged with a cursor
+        Records saved within API_CHANGES_LAG are left for the next sync
+        Bad timestamps and cursors return an error
+    """
+    fixtures = ['test_fixtures']
+
+    def get(self, **params):
+        response = self.client.get(reverse('changes'), params)
+        return json.loads(response.content)
+
+    def test_url_endpoint(self):
+        url = reverse('changes')
+        self.assertEqual(url, '/1/changes')
+
+    def test_full_sync(self):
+        data = self.get()
+        self.assertFalse(data['error']['status'])
+        self.assertEqual(len(data['vendors']), 2)
+        self.assertEqual(len(data['products']), 2)
+        self.assertEqual(len(data['stories']), 2)
+        self.assertIsNone(data['next'])
+
+    def test_since(self):
+        since = self.get()['until']
+
+        vendor = Vendor.objects.get(id=2)
+        vendor.name = 'Changed'
+        vendor.save()
+
+        data = self.get(since=since)
+        self.assertEqual([v['id'] for v in data['vendors']], [2])
+        self.assertEqual(data['vendors'][0]['name'], 'Changed')
+        self.assertEqual(data['products'], [])
+        self.assertEqual(data['stories'], [])
+
+    def test_deleted(self):
+        since = self.get()['until']
+        Product.objects.get(id=1).delete()
+        Story.objects.get(id=2).delete()
+
+        data = self.get(since=since)
+        self.assertEqual(data['deleted']['products'], [1])
+        self.assertEqual(data['deleted']['stories'], [2])
+        self.assertEqual(data['deleted']['vendors'], [])
+
+    def test_vendor_products_changed(self):
+        since = self.get()['until']
+
+        product = Product.objects.get(id=2)
+        product.name = 'Changed'
+        product.save()
+
+        data = self.get(since=since)
+        self.assertEqual([p['id'] for p in data['products']], [2])
+        self.assertEqual([v['id'] for v in data['vendors']], [1])
+        self.assertEqual(data['vendors'][0]['products'][0]['name'], 'Changed')
+
+    def test_paging(self):
+        since = (timezone.now() - timedelta(minutes=1)).isoformat()
+        for i in range(5):
+            Story.objects.create(name='Story %s' % i)
+
+        seen = []
+        data = self.get(since=since, limit=2)
+        while True:
+            self.assertLessEqual(len(data['stories']), 2)
+            seen.extend(s['id'] for s in data['stories'])
+            if not data['next']:
+                break
+            data = self.get(cursor=data['next'], limit=2)
+
+        self.assertEqual(len(seen), 5)
+        self.assertEqual(len(set(seen)), 5)
+
+    def test_bad_since(self):
+        data = self.get(since='last tuesday')
+        self.assertTrue(data['error']['status'])
+        self.assertEqual(data['error']['name'], 'Bad Sync Parameters')
+
+    def test_bad_cursor(self):
+        data = self.get(cursor='not-a-cursor')
+        self.assertTrue(data['error']['status'])
+
+    def test_lag(self):
+        Story.objects.create(name='Just saved')
+
+        with self.settings(API_CHANGES_LAG=60):
+            data = self.get()
+
+        self.assertEqual(len(data['stories']), 2)
+        self.assertLess(parse_datetime(data['until']),
+                        timezone.now() - timedelta(seconds=59))
+
+    def test_bad_cursor_positions(self):
+        cursor = encode_cursor({
+            'since': '2014-08-08T00:00:00Z',
+            'until': '2014-08-09T00:00:00Z',
+            'positions': ['vendors']
+        })
+        response = self.client.get(reverse('changes'), {'cursor': cursor})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(json.loads(response.content)['error']['name'],
+                         'Bad Sync Parameters')
@@ -0,0 +1,111 @@
+from django.test import TestCase
+from django.core.urlresolvers import reverse
+from django.utils.http import http_date
+from whats_fresh.whats_fresh_api.models import (Vendor, Product, Story,
+                                                Preparation, VendorProduct)
+
+from calendar import timegm
+
+
+class ConditionalGetTestCase(TestCase):
+    """
+    Test that the public API endpoints send ETag and Last-Modified headers,
+    and answer conditional requests with 304 Not Modified until the data
+    changes.
+    """
+    fixtures = ['test_fixtures']
+
+    def setUp(self):
+        self.urls = [
+            reverse('vendors-list'),
+            reverse('vendor-details', kwargs={'id': '1'}),
+            reverse('products-list'),
+            reverse('product-details', kwargs={'id': '1'}),
+            reverse('stories-list'),
+            reverse('story-details', kwargs={'id': '1'}),
+        ]
+
+    def test_headers(self):
+        for url in self.urls:
+            response = self.client.get(url)
+            self.assertTrue(response.has_header('ETag'), url)
+            self.assertTrue(response.has_header('Last-Modified'), url)
+
+    def test_if_none_match(self):
+        for url in self.urls:
+            etag = self.client.get(url)['ETag']
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 304, url)
+            self.assertEqual(response.content, b'')
+
+    def test_if_modified_since(self):
+        for url in self.urls:
+            last_modified = self.client.get(url)['Last-Modified']
+            response = self.client.get(
+                url, HTTP_IF_MODIFIED_SINCE=last_modified)
+            self.assertEqual(response.status_code, 304, url)
+
+    def test_etag_varies_with_query(self):
+        url = reverse('vendors-list')
+        etag = self.client.get(url)['ETag']
+        response = self.client.get(
+            '%s?limit=1' % url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_modified(self):
+        url = reverse('vendors-list')
+        response = self.client.get(url)
+        etag = response['ETag']
+        last_modified = response['Last-Modified']
+
+        vendor = Vendor.objects.get(id=1)
+        vendor.name = 'Renamed'
+        vendor.save()
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response['Last-Modified'],
+            http_date(timegm(vendor.modified.utctimetuple())))
+
+    def test_related_modified(self):
+        url = reverse('vendor-details', kwargs={'id': '1'})
+        etag = self.client.get(url)['ETag']
+
+        preparation = Preparation.objects.get(id=1)
+        preparation.name = 'Renamed'
+        preparation.save()
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+
+        vendor_product = VendorProduct.objects.get(id=1)
+        vendor_product.available = not vendor_product.available
+        vendor_product.save()
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_deleted(self):
+        url = reverse('products-list')
+        etag = self.client.get(url)['ETag']
+        Product.objects.get(id=2).delete()
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_detail_ignores_other_rows(self):
+        url = reverse('story-details', kwargs={'id': '1'})
+        etag = self.client.get(url)['ETag']
+
+        story = Story.objects.get(id=2)
+        story.name = 'Renamed'
+        story.save()
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
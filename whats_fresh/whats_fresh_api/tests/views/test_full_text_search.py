@@ -0,0 +1,86 @@
+from django.test import TestCase
+from django.test.utils import override_settings
+from django.core.urlresolvers import reverse
+from whats_fresh.whats_fresh_api.models import Product
+
+import json
+
+
+class SearchTestCase(TestCase):
+    """
+    Test the /1/search endpoint.
+
+    Things tested:
+        Products, vendors and stories are matched on their text fields
+        Matches on names rank above matches on descriptions
+        Edited objects are found by their new text
+        The substring fallback finds the same objects
+        Missing search text and empty results are reported
+    """
+    fixtures = ['test_fixtures']
+
+    def search(self, **params):
+        response = self.client.get(reverse('search'), params)
+        return json.loads(response.content)
+
+    def ids(self, data):
+        return dict((key, [item['id'] for item in data[key]])
+                    for key in ('products', 'vendors', 'stories'))
+
+    def test_url_endpoint(self):
+        self.assertEqual(reverse('search'), '/1/search')
+
+    def test_search(self):
+        data = self.search(q='fish')
+        self.assertEqual(
+            self.ids(data), {'products': [2], 'vendors': [], 'stories': [1]})
+        self.assertFalse(data['error']['status'])
+        self.assertIn('rank', data['products'][0]['ext'])
+
+        data = self.search(q='Sausalito')
+        self.assertEqual(
+            self.ids(data), {'products': [], 'vendors': [1], 'stories': []})
+
+    def test_ranking(self):
+        described = Product.objects.create(
+            name='Rockfish', description='Not a salmon', season='',
+            market_price='')
+        named = Product.objects.create(
+            name='Salmon', description='Pacific', season='',
+            market_price='')
+
+        data = self.search(q='salmon')
+        self.assertEqual(
+            [product['id'] for product in data['products']],
+            [named.id, described.id])
+
+        data = self.search(q='salmon', limit=1)
+        self.assertEqual(
+            [product['id'] for product in data['products']], [named.id])
+
+    def test_updated(self):
+        product = Product.objects.get(id=1)
+        product.name = 'Lamprey'
+        product.save()
+
+        data = self.search(q='lamprey')
+        self.assertEqual(self.ids(data)['products'], [1])
+
+    @override_settings(API_FULL_TEXT_SEARCH=False)
+    def test_fallback(self):
+        data = self.search(q='fish')
+        self.assertEqual(
+            self.ids(data), {'products': [2], 'vendors': [], 'stories': [1]})
+
+        data = self.search(q='north bend')
+        self.assertEqual(self.ids(data)['vendors'], [2])
+
+    def test_no_search_text(self):
+        data = self.search(q=' ')
+        self.assertEqual(data['error']['name'], 'No Search Text')
+
+    def test_no_results(self):
+        data = self.search(q='kraken')
+        self.assertEqual(data['error']['name'], 'No Results')
+        self.assertEqual(
+            self.ids(data), {'products': [], 'vendors': [], 'stories': []})
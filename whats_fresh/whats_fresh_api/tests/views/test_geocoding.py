@@ -0,0 +1,141 @@
+from django.test import TestCase
+from django.test.utils import override_settings
+from django.core.cache import caches
+from django.core.urlresolvers import reverse
+from django.contrib.auth.models import User, Group
+from whats_fresh.whats_fresh_api.models import Vendor
+from whats_fresh.whats_fresh_api.functions import (coordinates_from_address,
+                                                   BadAddressException)
+from whats_fresh.whats_fresh_api import geocoding
+from mock import patch
+
+import os
+
+GAZETTEER = os.path.join(os.path.dirname(__file__), '..', 'testdata',
+                         'gazetteer.csv')
+
+
+class LocalCachedGeocoder(geocoding.CachedGeocoder):
+
+    """
+    A cached geocoder which uses the local-memory default cache, rather than
+    the persistent geocoding cache.
+    """
+
+    cache_alias = 'default'
+
+
+class FailingGeocoder(geocoding.Geocoder):
+
+    """
+    A geocoder which fails the test if it is asked for an address.
+    """
+
+    def geocode(self, address):
+        raise AssertionError("Address %s was geocoded" % address)
+
+
+@override_settings(
+    GEOCODER_GAZETTEER=GAZETTEER,
+    GEOCODER_BACKENDS=(
+        'whats_fresh.whats_fresh_api.tests.views.test_geocoding.'
+        'LocalCachedGeocoder',
+        'whats_fresh.whats_fresh_api.geocoding.GazetteerGeocoder'))
+class GeocodingTestCase(TestCase):
+
+    """
+    Test the geocoder backends.
+
+    Things tested:
+        Addresses are found in the gazetteer
+        Addresses are normalized before they are looked up
+        Found addresses are stored in the geocoding cache
+        Backends which know no addresses are skipped
+        Errors from the geocoding cache don't stop addresses being found
+        Unknown addresses throw a BadAddressException
+    """
+
+    def setUp(self):
+        caches['default'].clear()
+
+    def test_gazetteer(self):
+        self.assertEqual(
+            coordinates_from_address(
+                '750 NW Lighthouse Dr', 'Newport', 'OR', '97365'),
+            [44.6752643, -124.072162])
+
+    def test_normalized(self):
+        self.assertEqual(
+            geocoding.geocode('750 nw  lighthouse dr.  NEWPORT OR 97365'),
+            (44.6752643, -124.072162))
+
+    def test_cached(self):
+        address = '750 NW Lighthouse Dr, Newport, OR 97365'
+        cache = LocalCachedGeocoder()
+        self.assertIsNone(cache.geocode(address))
+
+        geocoding.geocode(address)
+        self.assertEqual(cache.geocode(address), (44.6752643, -124.072162))
+
+        with self.settings(GEOCODER_GAZETTEER=None):
+            self.assertEqual(
+                geocoding.geocode(address), (44.6752643, -124.072162))
+
+    def test_base_backend(self):
+        with self.settings(GEOCODER_BACKENDS=(
+                'whats_fresh.whats_fresh_api.geocoding.Geocoder',
+                'whats_fresh.whats_fresh_api.geocoding.GazetteerGeocoder')):
+            self.assertEqual(
+                geocoding.geocode('750 NW Lighthouse Dr, Newport, OR 97365'),
+                (44.6752643, -124.072162))
+
+    def test_cache_errors(self):
+        with patch('whats_fresh.whats_fresh_api.geocoding.caches') as handler:
+            handler['default'].get.side_effect = IOError
+            handler['default'].set.side_effect = IOError
+            self.assertEqual(
+                geocoding.geocode('750 NW Lighthouse Dr, Newport, OR 97365'),
+                (44.6752643, -124.072162))
+
+    def test_not_found(self):
+        with self.assertRaises(BadAddressException):
+            coordinates_from_address('1 Nowhere St', 'Newport', 'OR', '97365')
+
+
+@override_settings(GEOCODER_BACKENDS=(
+    'whats_fresh.whats_fresh_api.tests.views.test_geocoding.FailingGeocoder',
+))
+class UnchangedAddressTestCase(TestCase):
+
+    """
+    Test that editing a vendor without changing its address does not
+    geocode the address again.
+    """
+    fixtures = ['test_fixtures']
+
+    def setUp(self):
+        user = User.objects.create_user(
+            'temporary', 'temporary@gmail.com', 'temporary')
+        admin_group = Group(name='Administration Users')
+        admin_group.save()
+        user.groups.add(admin_group)
+        self.client.login(username='temporary', password='temporary')
+
+    def test_unchanged_address(self):
+        vendor = {
+            'zip': '94965', 'website': '', 'hours': '',
+            'street': '1633 Sommerville Rd', 'story': 1,
+            'status': '', 'state': 'CA', 'preparation_ids': '1,2',
+            'phone': '', 'name': 'Renamed Vendor',
+            'location_description': '', 'email': '',
+            'description': 'Test Description',
+            'contact_name': 'Test Contact', 'city': 'Sausalito'}
+
+        response = self.client.post(
+            reverse('edit-vendor', kwargs={'id': '1'}), vendor)
+        self.assertEqual(response.status_code, 302)
+
+        vendor = Vendor.objects.get(id=1)
+        self.assertEqual(vendor.name, 'Renamed Vendor')
+        self.assertEqual(vendor.location.y, 37.833688)
+        self.assertEqual(vendor.location.x, -122.478002)
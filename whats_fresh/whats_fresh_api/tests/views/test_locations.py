@@ -1,5 +1,6 @@
 from django.test import TestCase
 from django.core.urlresolvers import reverse
+from whats_fresh.whats_fresh_api.models import Vendor
 import json
 
 
@@ -19,27 +20,38 @@ class LocationsTestCase(TestCase):
   },
   "locations": [
     {
-      "location": 0,
-      "name": "Gold Beach"
+      "location": 1192059599,
+      "name": "Corvallis",
+      "vendors": 1
     },
     {
-      "location": 1,
-      "name": "Corvallis"
+      "location": 2177855514,
+      "name": "Florence",
+      "vendors": 2
     },
     {
-      "location": 2,
-      "name": "Florence"
+      "location": 2302713583,
+      "name": "Gold Beach",
+      "vendors": 2
     },
     {
-      "location": 3,
-      "name": "Newport"
+      "location": 4165398972,
+      "name": "Newport",
+      "vendors": 5
     },
     {
-      "location": 4,
-      "name": "Waldport"
+      "location": 1716649627,
+      "name": "Waldport",
+      "vendors": 5
     }
   ]
 }"""
+        self.expected_centroids = [
+            (44.5670585, -123.2773277),
+            (43.9682045, -124.109134),
+            (42.42045315, -124.4206837),
+            (44.62850904, -124.06055876),
+            (44.42921214, -124.06985666)]
 
     def test_url_endpoint(self):
         url = reverse("locations")
@@ -52,5 +64,24 @@ class LocationsTestCase(TestCase):
         except ValueError:
             self.fail("Received answer is not JSON")
 
+        # The centroids are compared separately, to allow for rounding
+        centroids = [
+            (location.pop('lat'), location.pop('lng'))
+            for location in parsed_answer['locations']]
+
         expected_answer = json.loads(self.expected_json)
         self.assertEqual(parsed_answer, expected_answer)
+
+        for (lat, lng), (expected_lat, expected_lng) in zip(
+                centroids, self.expected_centroids):
+            self.assertAlmostEqual(lat, expected_lat, places=6)
+            self.assertAlmostEqual(lng, expected_lng, places=6)
+
+    def test_stable_ids(self):
+        first = json.loads(self.client.get('/1/locations').content)
+        Vendor.objects.filter(city='Corvallis').delete()
+        second = json.loads(self.client.get('/1/locations').content)
+
+        self.assertEqual(
+            [location['location'] for location in first['locations']][1:],
+            [location['location'] for location in second['locations']])
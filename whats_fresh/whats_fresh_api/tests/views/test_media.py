@@ -0,0 +1,93 @@
+from django.test import TestCase
+from django.test.client import RequestFactory
+from django.http import Http404
+from whats_fresh.whats_fresh_api.media import serve_media
+from whats_fresh.whats_fresh_api.storage import CompressedStaticFilesStorage
+
+import gzip
+import os
+import shutil
+import tempfile
+
+
+class MediaTestCase(TestCase):
+    """
+    Test the production serving of media and static files.
+
+    Things tested:
+        The web server is asked to send media files with MEDIA_SERVER
+        Files with hashed names can be cached forever
+        Paths outside MEDIA_ROOT are not served
+        collectstatic writes gzip copies of CSS files
+    """
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        os.mkdir(os.path.join(self.directory, 'images'))
+        for name in ('cat.jpg', 'cat.3f2a9c1b4d5e.jpg',
+                     'cat.3f2a9c1b4d5e.thumbnail.jpg'):
+            with open(os.path.join(self.directory, 'images', name),
+                      'wb') as image:
+                image.write(b'cat')
+        self.factory = RequestFactory()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def serve(self, path):
+        return serve_media(self.factory.get('/media/' + path), path)
+
+    def test_x_accel_redirect(self):
+        with self.settings(MEDIA_ROOT=self.directory,
+                           MEDIA_SERVER='x-accel-redirect'):
+            response = self.serve('images/cat.3f2a9c1b4d5e.jpg')
+
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['X-Accel-Redirect'],
+                         '/protected-media/images/cat.3f2a9c1b4d5e.jpg')
+        self.assertEqual(response['Content-Type'], 'image/jpeg')
+
+    def test_x_sendfile(self):
+        with self.settings(MEDIA_ROOT=self.directory,
+                           MEDIA_SERVER='x-sendfile'):
+            response = self.serve('images/cat.jpg')
+
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['X-Sendfile'], os.path.join(
+            self.directory, 'images', 'cat.jpg'))
+
+    def test_cache_headers(self):
+        with self.settings(MEDIA_ROOT=self.directory,
+                           MEDIA_SERVER='x-sendfile'):
+            hashed = self.serve('images/cat.3f2a9c1b4d5e.thumbnail.jpg')
+            unhashed = self.serve('images/cat.jpg')
+
+        self.assertEqual(hashed['Cache-Control'],
+                         'public, max-age=31536000, immutable')
+        self.assertEqual(unhashed['Cache-Control'], 'public, max-age=86400')
+
+    def test_development(self):
+        with self.settings(MEDIA_ROOT=self.directory, MEDIA_SERVER=None):
+            response = self.serve('images/cat.jpg')
+
+        self.assertEqual(b''.join(response), b'cat')
+        self.assertIn('max-age', response['Cache-Control'])
+
+    def test_not_found(self):
+        with self.settings(MEDIA_ROOT=self.directory,
+                           MEDIA_SERVER='x-sendfile'):
+            self.assertRaises(Http404, self.serve, 'images/dog.jpg')
+            self.assertRaises(Http404, self.serve, '../etc/passwd')
+
+    def test_compressed_static_files(self):
+        with open(os.path.join(self.directory, 'style.css'), 'w') as css:
+            css.write('body { color: black; }')
+
+        storage = CompressedStaticFilesStorage(location=self.directory)
+        processed = list(storage.post_process(
+            {'style.css': None, 'images/cat.jpg': None}))
+
+        self.assertEqual(processed, [('style.css', 'style.css', True)])
+        with gzip.open(os.path.join(self.directory, 'style.css.gz')) as gz:
+            self.assertEqual(gz.read(), b'body { color: black; }')
+        self.assertFalse(storage.exists('images/cat.jpg.gz'))
@@ -0,0 +1,98 @@
+from django.test import TestCase
+from django.core.urlresolvers import reverse
+from django.db import connection
+from django.contrib.gis.geos import fromstr
+from whats_fresh.whats_fresh_api.models import Vendor
+from whats_fresh.whats_fresh_api.functions import nearest_first
+
+import json
+
+
+class NearestVendorsTestCase(TestCase):
+    """
+    Test the nearest-first vendor listings.
+
+    Things tested:
+        nearest=true orders vendors by distance from the given location
+        k limits the listing to the k nearest vendors
+        Each vendor's distance in miles is returned in ext
+        Without a location, nearest is ignored
+    """
+    fixtures = ['location_fixtures']
+
+    def get(self, url=None, **params):
+        params.setdefault('lat', '44.609079')
+        params.setdefault('lng', '-124.052538')
+        response = self.client.get(url or reverse('vendors-list'), params)
+        return json.loads(response.content)
+
+    def test_nearest(self):
+        data = self.get(nearest='true', proximity=50)
+        self.assertEqual(
+            [v['id'] for v in data['vendors']], [3, 4, 5, 6, 7, 8])
+
+    def test_k(self):
+        data = self.get(k=2)
+        self.assertEqual([v['id'] for v in data['vendors']], [3, 4])
+        self.assertFalse(data['error']['status'])
+
+    def test_distance(self):
+        data = self.get(k=2)
+        self.assertAlmostEqual(
+            data['vendors'][0]['ext']['distance'], 1.56, places=1)
+        self.assertAlmostEqual(
+            data['vendors'][1]['ext']['distance'], 2.55, places=1)
+
+    def test_bad_k(self):
+        data = self.get(k='many')
+        self.assertEqual(data['error']['name'], 'Bad K')
+        self.assertEqual([v['id'] for v in data['vendors']][:2], [3, 4])
+
+    def test_no_location(self):
+        response = self.client.get(reverse('vendors-list'), {'k': 2})
+        data = json.loads(response.content)
+        self.assertEqual(len(data['vendors']), 8)
+        for vendor in data['vendors']:
+            self.assertEqual(vendor['ext'], {})
+
+    def test_vendors_products(self):
+        data = self.get(
+            reverse('vendors-products', kwargs={'id': '1'}),
+            nearest='true', proximity=50)
+        self.assertEqual([v['id'] for v in data['vendors']], [4, 6, 8])
+
+
+class NearestVendorsIndexTestCase(TestCase):
+    """
+    Test that at 100,000 vendors, nearest-first queries are answered by a
+    scan of the spatial index rather than by sorting the whole table.
+    """
+
+    def setUp(self):
+        cursor = connection.cursor()
+        cursor.execute("""
+            INSERT INTO whats_fresh_api_vendor (
+                name, description, hours, street, city, state, zip,
+                location_description, contact_name, website, email,
+                location, created, modified)
+            SELECT
+                'Vendor ' || n, '', '', '', 'City', 'OR', '97365', '', '',
+                '', '',
+                ST_SetSRID(ST_MakePoint(
+                    -124.5 + random() * 8, 42 + random() * 4), 4326),
+                now(), now()
+            FROM generate_series(1, 100000) AS n
+        """)
+        cursor.execute("ANALYZE whats_fresh_api_vendor")
+
+    def test_index_scan(self):
+        point = fromstr('POINT(-124.052538 44.609079)', srid=4326)
+        queryset = nearest_first(Vendor.objects.all(), point)[:10]
+        sql, params = queryset.query.sql_with_params()
+
+        cursor = connection.cursor()
+        cursor.execute('EXPLAIN ' + sql, params)
+        plan = '\n'.join(row[0] for row in cursor.fetchall())
+
+        self.assertIn('Index Scan', plan)
+        self.assertNotIn('Seq Scan', plan)
@@ -0,0 +1,85 @@
+from django.test import TestCase
+from django.core.urlresolvers import reverse
+from whats_fresh.whats_fresh_api.models import Story
+
+import json
+
+
+class PaginationTestCase(TestCase):
+    """
+    Test the cursor pagination of the list endpoints.
+
+    Things tested:
+        Unpaged requests return every result, with no cursors
+        page_size returns the first page, with a next cursor
+        Following next cursors returns every result exactly once
+        prev cursors return the previous page
+        Bad cursors return the first page with a warning
+    """
+    fixtures = ['test_fixtures']
+
+    def setUp(self):
+        for i in range(5):
+            Story.objects.create(name='Story %s' % i)
+        self.ids = sorted(Story.objects.values_list('id', flat=True))
+
+    def get(self, **params):
+        response = self.client.get(reverse('stories-list'), params)
+        return json.loads(response.content)
+
+    def test_unpaged(self):
+        data = self.get()
+        self.assertEqual(len(data['stories']), 7)
+        self.assertNotIn('next', data)
+        self.assertNotIn('prev', data)
+
+    def test_first_page(self):
+        data = self.get(page_size=3)
+        self.assertEqual([s['id'] for s in data['stories']], self.ids[:3])
+        self.assertIsNotNone(data['next'])
+        self.assertIsNone(data['prev'])
+
+    def test_next_pages(self):
+        seen = []
+        data = self.get(page_size=3)
+        pages = 1
+        while data['next']:
+            seen.extend(s['id'] for s in data['stories'])
+            data = self.get(cursor=data['next'])
+            pages += 1
+        seen.extend(s['id'] for s in data['stories'])
+
+        self.assertEqual(pages, 3)
+        self.assertEqual(seen, self.ids)
+
+    def test_prev_page(self):
+        first = self.get(page_size=3)
+        second = self.get(cursor=first['next'])
+        self.assertEqual([s['id'] for s in second['stories']], self.ids[3:6])
+
+        data = self.get(cursor=second['prev'])
+        self.assertEqual([s['id'] for s in data['stories']], self.ids[:3])
+        self.assertIsNone(data['prev'])
+        self.assertEqual(data['next'], first['next'])
+
+    def test_page_size_limit(self):
+        with self.settings(API_MAX_PAGE_LENGTH=2):
+            data = self.get(page_size=5)
+        self.assertEqual(len(data['stories']), 2)
+
+    def test_bad_cursor(self):
+        data = self.get(cursor='garbage')
+        self.assertEqual(data['error']['name'], 'Bad Cursor')
+        self.assertEqual([s['id'] for s in data['stories']], self.ids)
+
+    def test_vendors_paged(self):
+        response = self.client.get(
+            reverse('vendors-list'), {'page_size': 1})
+        data = json.loads(response.content)
+        self.assertEqual([v['id'] for v in data['vendors']], [1])
+
+        response = self.client.get(
+            reverse('vendors-list'), {'cursor': data['next']})
+        data = json.loads(response.content)
+        self.assertEqual([v['id'] for v in data['vendors']], [2])
+        self.assertIsNone(data['next'])
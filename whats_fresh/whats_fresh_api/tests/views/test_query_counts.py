@@ -0,0 +1,91 @@
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.core.urlresolvers import reverse
+from django.db import connection
+from django.contrib.gis.geos import fromstr
+from whats_fresh.whats_fresh_api.models import (Vendor, Product, Preparation,
+                                                ProductPreparation,
+                                                VendorProduct, Story)
+
+
+class QueryCountTestCase(TestCase):
+    """
+    Test that the number of queries used by the vendor endpoints does not
+    grow with the number of vendors, products and preparations returned.
+    """
+    fixtures = ['test_fixtures']
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries)
+
+    def add_vendors(self, count, products_per_vendor=5):
+        preparation = Preparation.objects.get(id=1)
+        product = Product.objects.get(id=1)
+        for i in range(count):
+            vendor = Vendor.objects.create(
+                name='Vendor %s' % i, description='Description',
+                street='1 Street', city='City', state='OR', zip='97365',
+                contact_name='Contact',
+                location=fromstr('POINT(-122.478002 37.833688)', srid=4326))
+            for j in range(products_per_vendor):
+                product_preparation = ProductPreparation.objects.create(
+                    product=Product.objects.create(
+                        name='Product %s-%s' % (i, j), description='',
+                        season='', market_price=''),
+                    preparation=preparation)
+                VendorProduct.objects.create(
+                    vendor=vendor, product_preparation=product_preparation)
+            VendorProduct.objects.create(
+                vendor=vendor,
+                product_preparation=ProductPreparation.objects.create(
+                    product=product, preparation=preparation))
+
+    def assertConstantQueries(self, url):
+        before = self.count_queries(url)
+        self.add_vendors(10)
+        after = self.count_queries(url)
+        self.add_vendors(20)
+        self.assertEqual(before, after)
+        self.assertEqual(after, self.count_queries(url))
+
+    def test_vendor_list(self):
+        self.assertConstantQueries(reverse('vendors-list'))
+
+    def test_vendor_list_proximity(self):
+        self.assertConstantQueries(
+            '%s?lat=37.833688&lng=-122.478002' % reverse('vendors-list'))
+
+    def test_vendors_products(self):
+        self.assertConstantQueries(
+            reverse('vendors-products', kwargs={'id': '1'}))
+
+    def test_vendor_details(self):
+        url = reverse('vendor-details', kwargs={'id': '1'})
+        before = self.count_queries(url)
+        vendor = Vendor.objects.get(id=1)
+        preparation = Preparation.objects.get(id=1)
+        for i in range(20):
+            VendorProduct.objects.create(
+                vendor=vendor,
+                product_preparation=ProductPreparation.objects.create(
+                    product=Product.objects.create(
+                        name='Product %s' % i, description='',
+                        season='', market_price=''),
+                    preparation=preparation))
+        self.assertEqual(before, self.count_queries(url))
+
+    def test_product_list(self):
+        url = reverse('products-list')
+        before = self.count_queries(url)
+        self.add_vendors(5)
+        self.assertEqual(before, self.count_queries(url))
+
+    def test_story_list(self):
+        url = reverse('stories-list')
+        before = self.count_queries(url)
+        for i in range(10):
+            Story.objects.create(name='Story %s' % i)
+        self.assertEqual(before, self.count_queries(url))
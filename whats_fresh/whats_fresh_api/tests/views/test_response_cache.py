@@ -0,0 +1,96 @@
+from django.test import TestCase
+from django.test.utils import override_settings
+from django.core.urlresolvers import reverse
+from whats_fresh.whats_fresh_api.models import Vendor, Product, Story, Image
+from whats_fresh.whats_fresh_api import response_cache
+
+import json
+
+
+@override_settings(API_CACHE_ENABLED=True)
+class ResponseCacheTestCase(TestCase):
+    """
+    Test that the public API responses are cached, keyed on the normalized
+    query string, and invalidated when API data is saved or deleted.
+    """
+    fixtures = ['test_fixtures']
+
+    def setUp(self):
+        response_cache.get_cache().clear()
+
+    def test_hit_after_miss(self):
+        response = self.client.get(reverse('vendors-list'))
+        self.assertEqual(response['X-Cache'], 'MISS')
+
+        cached = self.client.get(reverse('vendors-list'))
+        self.assertEqual(cached['X-Cache'], 'HIT')
+        self.assertEqual(cached.content, response.content)
+
+        stats = response_cache.cache_stats()
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 1)
+
+    def test_normalized_query_string(self):
+        self.client.get(
+            '%s?lat=37.833688&lng=-122.478002' % reverse('vendors-list'))
+        response = self.client.get(
+            '%s?lng=-122.478002&lat=37.833688' % reverse('vendors-list'))
+        self.assertEqual(response['X-Cache'], 'HIT')
+
+        response = self.client.get('%s?limit=1' % reverse('vendors-list'))
+        self.assertEqual(response['X-Cache'], 'MISS')
+
+    def test_errors_not_cached(self):
+        url = reverse('vendor-details', kwargs={'id': '999'})
+        self.client.get(url)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response['X-Cache'], 'MISS')
+
+    def test_invalidated_on_save(self):
+        self.client.get(reverse('vendors-list'))
+
+        vendor = Vendor.objects.get(id=1)
+        vendor.name = 'Renamed'
+        vendor.save()
+
+        response = self.client.get(reverse('vendors-list'))
+        self.assertEqual(response['X-Cache'], 'MISS')
+        names = [v['name'] for v in json.loads(response.content)['vendors']]
+        self.assertIn('Renamed', names)
+
+    def test_invalidated_on_delete(self):
+        self.client.get(reverse('products-list'))
+        Product.objects.get(id=1).delete()
+
+        response = self.client.get(reverse('products-list'))
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(len(json.loads(response.content)['products']), 1)
+
+    def test_invalidated_on_m2m_change(self):
+        url = reverse('story-details', kwargs={'id': '1'})
+        self.client.get(url)
+        Story.objects.get(id=1).images.remove(Image.objects.get(id=1))
+
+        response = self.client.get(url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+
+    def test_conditional_hit(self):
+        url = reverse('vendors-list')
+        response = self.client.get(url)
+
+        # The validators are stored with the response, so neither a hit
+        # nor a 304 queries the database.
+        with self.assertNumQueries(0):
+            cached = self.client.get(url)
+            not_modified = self.client.get(
+                url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(cached['ETag'], response['ETag'])
+        self.assertEqual(cached['Last-Modified'], response['Last-Modified'])
+        self.assertEqual(not_modified.status_code, 304)
+
+    @override_settings(API_CACHE_ENABLED=False)
+    def test_disabled(self):
+        self.client.get(reverse('stories-list'))
+        response = self.client.get(reverse('stories-list'))
+        self.assertFalse(response.has_header('X-Cache'))
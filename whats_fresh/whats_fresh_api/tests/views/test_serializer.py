@@ -0,0 +1,109 @@
+from django.test import TestCase
+from django.core.serializers import json as json_serializer
+from django.core.urlresolvers import reverse
+from whats_fresh.whats_fresh_api.models import Vendor, Product, Story
+from whats_fresh.whats_fresh_api.views.serializer import (FreshSerializer,
+                                                          render_json)
+
+import json
+
+NO_ERROR = {
+    'status': False,
+    'name': None,
+    'text': None,
+    'level': None,
+    'debug': None
+}
+
+
+class LegacySerializer(json_serializer.Serializer):
+    """
+    The string-producing serializer the views used to round-trip through
+    json.loads before encoding the response a second time, frozen as it was
+    so that FreshSerializer is compared with the old output rather than
+    with itself.
+    """
+
+    def get_dump_object(self, obj):
+        self._current['id'] = obj.id
+
+        if isinstance(obj, Vendor):
+            self._current['lat'] = obj.location.y
+            self._current['lng'] = obj.location.x
+            del self._current['location']
+
+            self._current['products'] = [
+                {
+                    'name': pp.product.name,
+                    'preparation': pp.preparation.name,
+                    'product_id': pp.product.id,
+                    'preparation_id': pp.preparation_id
+                }
+                for pp in obj.products_preparations.all()
+            ]
+
+        self._current['ext'] = {}
+        return self._current
+
+
+class FreshSerializerTestCase(TestCase):
+    """
+    Test that the views encode the same bytes as the old serialize ->
+    json.loads -> json.dumps path, without the extra passes.
+    """
+    fixtures = ['test_fixtures']
+
+    def legacy_list(self, name, objects):
+        return json.dumps({
+            name: json.loads(LegacySerializer().serialize(
+                objects, use_natural_foreign_keys=True)),
+            'error': NO_ERROR
+        })
+
+    def legacy_details(self, obj):
+        data = json.loads(LegacySerializer().serialize(
+            [obj], use_natural_foreign_keys=True)[1:-1])
+        data['error'] = NO_ERROR
+        return json.dumps(data)
+
+    def test_serialize_returns_dicts(self):
+        serialized = FreshSerializer().serialize(
+            Vendor.objects.all(), use_natural_foreign_keys=True)
+        self.assertEqual(len(serialized), 2)
+        for vendor in serialized:
+            self.assertTrue(isinstance(vendor, dict))
+
+    def test_lists_match_legacy_encoding(self):
+        for url, name, model in (
+                ('vendors-list', 'vendors', Vendor),
+                ('products-list', 'products', Product),
+                ('stories-list', 'stories', Story)):
+            content = self.client.get(reverse(url)).content
+
+            # The lists are unordered; encode the objects in the order the
+            # view returned them.
+            ids = [item['id'] for item in json.loads(content)[name]]
+            objects = model.objects.in_bulk(ids)
+            self.assertEqual(
+                content, self.legacy_list(name, [objects[i] for i in ids]))
+
+    def test_details_match_legacy_encoding(self):
+        for url, model in (('vendor-details', Vendor),
+                           ('product-details', Product),
+                           ('story-details', Story)):
+            content = self.client.get(
+                reverse(url, kwargs={'id': '1'})).content
+            self.assertEqual(
+                content, self.legacy_details(model.objects.get(id=1)))
+
+    def test_render_json(self):
+        data = {'vendors': [], 'error': NO_ERROR}
+        self.assertEqual(render_json(data).content, json.dumps(data))
+
+    def test_serialize_object(self):
+        vendor = Vendor.objects.get(id=1)
+        serializer = FreshSerializer()
+        self.assertEqual(
+            serializer.serialize_object(
+                vendor, use_natural_foreign_keys=True),
+            serializer.serialize([vendor], use_natural_foreign_keys=True)[0])
@@ -0,0 +1,82 @@
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.core.urlresolvers import reverse
+from django.db import connection
+
+import json
+
+
+class SparseFieldsTestCase(TestCase):
+    """
+    Test the ?fields= parameter of the /1/ endpoints.
+
+    Things tested:
+        Only the fields named, and id and ext, are returned
+        Vendor products are neither fetched nor returned unless named
+        Columns which aren't named are not fetched
+        Unknown fields are ignored with a warning
+        Without fields, every field is returned
+    """
+    fixtures = ['test_fixtures']
+
+    def get(self, url, **params):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, params)
+        self.queries = [query['sql'] for query in context.captured_queries]
+        return json.loads(response.content)
+
+    def joined(self, table):
+        # The conditional GET checks read every related table, but only
+        # the lookups for related objects join them
+        return [sql for sql in self.queries
+                if 'JOIN' in sql and table in sql]
+
+    def test_vendor_list(self):
+        data = self.get(reverse('vendors-list'), fields='name,lat,lng')
+        for vendor in data['vendors']:
+            self.assertEqual(
+                sorted(vendor), ['ext', 'id', 'lat', 'lng', 'name'])
+        self.assertEqual(data['error']['status'], False)
+
+    def test_vendor_products_not_fetched(self):
+        self.get(reverse('vendors-list'))
+        full = self.queries
+        self.get(reverse('vendors-list'), fields='name')
+        sparse = self.queries
+
+        self.assertLess(len(sparse), len(full))
+        self.assertEqual(self.joined('whats_fresh_api_vendorproduct'), [])
+        for sql in sparse:
+            self.assertNotIn('"description"', sql)
+
+    def test_vendor_products(self):
+        data = self.get(
+            reverse('vendor-details', kwargs={'id': 1}), fields='products')
+        self.assertEqual(sorted(data), ['error', 'ext', 'id', 'products'])
+        self.assertEqual(len(data['products']), 2)
+
+    def test_product_list(self):
+        data = self.get(reverse('products-list'), fields='name,image')
+        for product in data['products']:
+            self.assertEqual(sorted(product), ['ext', 'id', 'image', 'name'])
+
+    def test_product_image_not_fetched(self):
+        self.get(reverse('products-list'), fields='name')
+        self.assertEqual(self.joined('whats_fresh_api_image'), [])
+
+    def test_story_list(self):
+        data = self.get(reverse('stories-list'), fields='images')
+        for story in data['stories']:
+            self.assertEqual(sorted(story), ['ext', 'id', 'images'])
+        self.assertEqual(self.joined('whats_fresh_api_story_videos'), [])
+
+    def test_unknown_field(self):
+        data = self.get(reverse('vendors-list'), fields='name,colour')
+        self.assertEqual(data['error']['name'], 'Bad Fields')
+        for vendor in data['vendors']:
+            self.assertEqual(sorted(vendor), ['ext', 'id', 'name'])
+
+    def test_all_fields(self):
+        data = self.get(reverse('vendors-list'))
+        self.assertIn('products', data['vendors'][0])
+        self.assertIn('description', data['vendors'][0])
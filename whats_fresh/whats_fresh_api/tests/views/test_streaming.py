@@ -0,0 +1,71 @@
+from django.test import TestCase
+from django.test.utils import override_settings
+from django.core.urlresolvers import reverse
+from whats_fresh.whats_fresh_api.models import Vendor, Product
+
+import json
+
+
+def by_id(data):
+    """
+    Sort the listings of a response by id: streamed listings are in id
+    order, buffered ones in database order.
+    """
+    for key in ('vendors', 'products'):
+        if key in data:
+            data[key].sort(key=lambda item: item['id'])
+    return data
+
+
+class StreamingTestCase(TestCase):
+    """
+    Test that with API_STREAMING, whole vendor and product listings are
+    streamed, and the streamed JSON is the same as the buffered response.
+    """
+    fixtures = ['test_fixtures']
+
+    def buffered(self, url):
+        with self.settings(API_STREAMING=False):
+            response = self.client.get(url)
+        self.assertFalse(response.streaming)
+        return by_id(json.loads(response.content))
+
+    def streamed(self, url):
+        response = self.client.get(url)
+        self.assertTrue(response.streaming)
+        return by_id(json.loads(b''.join(response.streaming_content)))
+
+    @override_settings(API_STREAMING=True, API_STREAM_CHUNK_SIZE=1)
+    def test_vendors(self):
+        url = reverse('vendors-list')
+        self.assertEqual(self.streamed(url), self.buffered(url))
+
+    @override_settings(API_STREAMING=True, API_STREAM_CHUNK_SIZE=1)
+    def test_vendors_proximity(self):
+        url = '%s?lat=37.833688&lng=-122.478002&proximity=5' % reverse(
+            'vendors-list')
+        self.assertEqual(self.streamed(url), self.buffered(url))
+
+    @override_settings(API_STREAMING=True, API_STREAM_CHUNK_SIZE=1)
+    def test_products(self):
+        url = reverse('products-list')
+        self.assertEqual(self.streamed(url), self.buffered(url))
+
+    @override_settings(API_STREAMING=True)
+    def test_limited_not_streamed(self):
+        response = self.client.get('%s?limit=1' % reverse('products-list'))
+        self.assertFalse(response.streaming)
+
+        response = self.client.get(
+            reverse('vendors-list'), {'page_size': 1})
+        self.assertFalse(response.streaming)
+
+    @override_settings(API_STREAMING=True)
+    def test_empty_not_streamed(self):
+        Vendor.objects.all().delete()
+        Product.objects.all().delete()
+
+        response = self.client.get(reverse('vendors-list'))
+        self.assertFalse(response.streaming)
+        self.assertEqual(
+            json.loads(response.content)['error']['name'], 'No Vendors')
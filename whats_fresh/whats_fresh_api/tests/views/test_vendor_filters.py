@@ -0,0 +1,62 @@
+from django.test import TestCase
+from django.core.urlresolvers import reverse
+
+import json
+
+
+class VendorFiltersTestCase(TestCase):
+    """
+    Test the filters of the /1/vendors endpoint.
+
+    Things tested:
+        city matches vendors in the city, ignoring case
+        product and preparation match vendors selling them
+        available matches the vendor product selected by the other filters
+        status matches the vendor's status
+        Filters combine
+        Bad filters are ignored with a warning
+    """
+    fixtures = ['test_fixtures']
+
+    def get(self, **params):
+        response = self.client.get(reverse('vendors-list'), params)
+        return json.loads(response.content)
+
+    def ids(self, **params):
+        return sorted(vendor['id'] for vendor in self.get(**params)['vendors'])
+
+    def test_city(self):
+        self.assertEqual(self.ids(city='sausalito'), [1])
+        self.assertEqual(self.ids(city='North Bend'), [2])
+        self.assertEqual(self.ids(city='Newport'), [])
+
+    def test_product(self):
+        self.assertEqual(self.ids(product=1), [1, 2])
+        self.assertEqual(self.ids(product=2), [1])
+
+    def test_preparation(self):
+        data = self.get(preparation=2)
+        self.assertEqual(data['vendors'], [])
+        self.assertEqual(data['error']['name'], 'No Vendors')
+
+    def test_available(self):
+        self.assertEqual(self.ids(product=1, available='false'), [1, 2])
+        self.assertEqual(self.ids(product=2, available='false'), [])
+
+    def test_status(self):
+        self.assertEqual(self.ids(status='true'), [1])
+        self.assertEqual(self.ids(status='false'), [])
+
+    def test_combined(self):
+        self.assertEqual(self.ids(city='North Bend', product=1), [2])
+        self.assertEqual(self.ids(city='North Bend', product=2), [])
+
+    def test_one_vendor_per_match(self):
+        # Vendor 1 sells two products with preparation 1, but is listed once
+        self.assertEqual(self.ids(preparation=1), [1, 2])
+
+    def test_bad_filter(self):
+        data = self.get(product='crab')
+        self.assertEqual(data['error']['name'], 'Bad Filter')
+        self.assertEqual(
+            sorted(vendor['id'] for vendor in data['vendors']), [1, 2])
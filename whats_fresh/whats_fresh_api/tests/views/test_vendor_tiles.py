@@ -0,0 +1,83 @@
+from django.test import TestCase
+from django.core.urlresolvers import reverse
+from django.contrib.gis.geos import fromstr
+from whats_fresh.whats_fresh_api.models import Vendor
+from whats_fresh.whats_fresh_api.views.tiles import tile_bounds
+
+import json
+
+
+class VendorTilesTestCase(TestCase):
+    """
+    Test the /1/vendors/tiles/<z>/<x>/<y> endpoint.
+
+    Things tested:
+        Tile bounds follow the Web Mercator tile numbering
+        Vendors in the tile are returned as markers at high zoom
+        Vendors close together are clustered at low zoom
+        Vendors outside the tile are not returned
+        Tiles which don't exist are not found
+    """
+    fixtures = ['test_fixtures']
+
+    def get(self, z, x, y):
+        response = self.client.get(
+            reverse('vendor-tiles', kwargs={'z': z, 'x': x, 'y': y}))
+        return response, json.loads(response.content)
+
+    def test_url_endpoint(self):
+        url = reverse('vendor-tiles', kwargs={'z': 1, 'x': 2, 'y': 3})
+        self.assertEqual(url, '/1/vendors/tiles/1/2/3')
+
+    def test_tile_bounds(self):
+        west, south, east, north = tile_bounds(0, 0, 0)
+        self.assertEqual((west, east), (-180, 180))
+        self.assertAlmostEqual(north, 85.0511288, places=6)
+        self.assertAlmostEqual(south, -85.0511288, places=6)
+
+        west, south, east, north = tile_bounds(1, 1, 0)
+        self.assertEqual((west, east), (0, 180))
+        self.assertAlmostEqual(south, 0)
+
+    def test_markers(self):
+        # Both fixture vendors are in Sausalito, in tile 15/5235/12658
+        response, data = self.get(15, 5235, 12658)
+        self.assertEqual(data['error']['status'], False)
+        self.assertEqual(data['clusters'], [])
+        self.assertEqual(
+            [marker['id'] for marker in data['markers']], [1, 2])
+        self.assertEqual(
+            sorted(data['markers'][0]), ['id', 'lat', 'lng', 'name'])
+        self.assertAlmostEqual(data['markers'][0]['lat'], 37.833688)
+        self.assertAlmostEqual(data['markers'][0]['lng'], -122.478002)
+
+    def add_vendor(self, name, location):
+        Vendor.objects.create(
+            name=name, description='Description', street='1 Street',
+            city='City', state='OR', zip='97365', contact_name='Contact',
+            location=fromstr(location, srid=4326))
+
+    def test_clusters(self):
+        Vendor.objects.filter(id=2).update(
+            location=fromstr('POINT(-122.4 37.9)', srid=4326))
+        self.add_vendor('Nevada', 'POINT(-114 40)')
+        self.add_vendor('Newport', 'POINT(-124.05 44.63)')
+
+        # Tile 5/5/12 covers California and Nevada, but not Oregon
+        response, data = self.get(5, 5, 12)
+        self.assertEqual(len(data['clusters']), 1)
+        self.assertEqual(data['clusters'][0]['vendors'], 2)
+        self.assertAlmostEqual(data['clusters'][0]['lat'], 37.866844)
+        self.assertAlmostEqual(data['clusters'][0]['lng'], -122.439001)
+        self.assertEqual(
+            [marker['name'] for marker in data['markers']], ['Nevada'])
+
+    def test_empty_tile(self):
+        response, data = self.get(15, 0, 0)
+        self.assertEqual(data['markers'], [])
+        self.assertEqual(data['clusters'], [])
+
+    def test_tile_not_found(self):
+        response, data = self.get(2, 4, 0)
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(data['error']['name'], 'Tile Not Found')
@@ -0,0 +1,89 @@
+import hashlib
+import os
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from PIL import Image as PILImage
+
+
+class HashingFileUploadHandler(TemporaryFileUploadHandler):
+
+    """
+    Streams every uploaded file to a temporary file on disk, a chunk at a
+    time, hashing it on the way. The SHA-256 of the file is set as the
+    content_hash attribute of the uploaded file.
+
+    Installed by the FILE_UPLOAD_HANDLERS setting.
+    """
+
+    def new_file(self, *args, **kwargs):
+        super(HashingFileUploadHandler, self).new_file(*args, **kwargs)
+        self.hash = hashlib.sha256()
+
+    def receive_data_chunk(self, raw_data, start):
+        self.hash.update(raw_data)
+        return super(HashingFileUploadHandler, self).receive_data_chunk(
+            raw_data, start)
+
+    def file_complete(self, file_size):
+        uploaded = super(HashingFileUploadHandler, self).file_complete(
+            file_size)
+        uploaded.content_hash = self.hash.hexdigest()
+        return uploaded
+
+
+def content_hash(uploaded):
+    """
+    Return the SHA-256 of an uploaded file, as computed by
+    HashingFileUploadHandler, or by reading it if it was uploaded through
+    another handler.
+    """
+    if getattr(uploaded, 'content_hash', None):
+        return uploaded.content_hash
+    file_hash = hashlib.sha256()
+    for chunk in uploaded.chunks():
+        file_hash.update(chunk)
+    return file_hash.hexdigest()
+
+
+def image_upload_to(image, filename):
+    """
+    Return the name an uploaded image file is stored under: images/, and
+    its original name with the start of its content hash added, as in
+    images/cat.3f2a9c1b4d5e.jpg. A file's name then changes whenever its
+    contents do, so it can be cached forever.
+    """
+    image.content_hash = content_hash(image.image.file)
+    base, extension = os.path.splitext(os.path.basename(filename))
+    return 'images/%s.%s%s' % (base, image.content_hash[:12], extension)
+
+
+def check_pixels(uploaded):
+    """
+    Raise ValidationError if the uploaded image has more than
+    IMAGE_MAX_PIXELS pixels. Only the image header is read, so images too
+    large to decode are rejected without being decoded.
+    """
+    uploaded.seek(0)
+    width, height = PILImage.open(uploaded).size
+    uploaded.seek(0)
+    if width * height > settings.IMAGE_MAX_PIXELS:
+        raise ValidationError(
+            'The image is %(width)sx%(height)s pixels. Images can have at '
+            'most %(limit)s pixels.',
+            code='too_many_pixels',
+            params={'width': width, 'height': height,
+                    'limit': settings.IMAGE_MAX_PIXELS})
+
+
+def find_duplicate(image):
+    """
+    Set the content_hash of an Image with a new upload, and return an
+    existing Image with the same file contents, or None.
+    """
+    from whats_fresh.whats_fresh_api.models import Image
+
+    image.content_hash = content_hash(image.image.file)
+    return Image.objects.filter(content_hash=image.content_hash).exclude(
+        id=image.id).first()
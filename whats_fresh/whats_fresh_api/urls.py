@@ -29,6 +29,9 @@ urlpatterns = patterns(
     url(r'^1/vendors/products/(?P<id>\d+)/?$',
         'whats_fresh.whats_fresh_api.views.vendor.vendors_products',
         name='vendors-products'),
+    url(r'^1/vendors/tiles/(?P<z>\d+)/(?P<x>\d+)/(?P<y>\d+)/?$',
+        'whats_fresh.whats_fresh_api.views.tiles.vendor_tiles',
+        name='vendor-tiles'),
 
     url(r'^1/preparations/(?P<id>\d+)/?$',
         'whats_fresh.whats_fresh_api.views.preparation.preparation_details',
@@ -38,6 +41,31 @@ urlpatterns = patterns(
         'whats_fresh.whats_fresh_api.views.location.locations',
         name='locations'),
 
+    url(r'^1/search/?$',
+        'whats_fresh.whats_fresh_api.views.search.search',
+        name='search'),
+
+    url(r'^1/changes/?$',
+        'whats_fresh.whats_fresh_api.views.changes.changes',
+        name='changes'),
+
+    url(r'^entry/search/images/?$',
+        'whats_fresh.whats_fresh_api.views.entry.search.image_search',
+        name='search-images'),
+
+    url(r'^entry/search/videos/?$',
+        'whats_fresh.whats_fresh_api.views.entry.search.video_search',
+        name='search-videos'),
+
+    url(r'^entry/search/preparations/?$',
+        'whats_fresh.whats_fresh_api.views.entry.search.preparation_search',
+        name='search-preparations'),
+
+    url(r'^entry/search/product-preparations/?$',
+        'whats_fresh.whats_fresh_api.views.entry.search.'
+        'product_preparation_search',
+        name='search-product-preparations'),
+
     url(r'^entry/vendors/new/?$',
         'whats_fresh.whats_fresh_api.views.entry.vendors.vendor',
         name='new-vendor'),
@@ -0,0 +1,180 @@
+from django.conf import settings
+from django.db.models import Q
+from django.http import HttpResponseBadRequest
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from whats_fresh.whats_fresh_api.models import (Vendor, Product, Story,
+                                                Tombstone)
+from whats_fresh.whats_fresh_api.functions import (get_limit, encode_cursor,
+                                                   decode_cursor,
+                                                   BadCursorException)
+
+from datetime import datetime, timedelta
+from .serializer import (FreshSerializer, get_fields, plan_queryset,
+                         render_json)
+
+# Response key, model, and tombstone model name for each synced record type
+SYNCED = (
+    ('vendors', Vendor, 'vendor'),
+    ('products', Product, 'product'),
+    ('stories', Story, 'story'),
+)
+
+
+def parse_timestamp(value):
+    """
+    Parse an ISO 8601 timestamp, as used by the created and modified fields
+    of the API. Timestamps without a timezone are taken to be UTC.
+    """
+    timestamp = parse_datetime(value)
+    if timestamp is None:
+        raise ValueError("Timestamp %s is not valid" % value)
+    if timezone.is_naive(timestamp):
+        timestamp = timezone.make_aware(timestamp, timezone.utc)
+    return timestamp
+
+
+def parse_positions(positions):
+    """
+    Parse the positions of a cursor, {key: [timestamp, id] or false}, into
+    {key: (timestamp, id) or False}. Raises ValueError if they are not in
+    that form.
+    """
+    if not isinstance(positions, dict):
+        raise ValueError("Cursor positions %r are not valid" % positions)
+    parsed = {}
+    for key, position in positions.items():
+        if position is False:
+            parsed[key] = False
+        elif isinstance(position, list) and len(position) == 2:
+            parsed[key] = (parse_timestamp(position[0]), int(position[1]))
+        else:
+            raise ValueError("Cursor position %r is not valid" % position)
+    return parsed
+
+
+def after(queryset, field, position):
+    """
+    Filter queryset to the rows following position, a (timestamp, id) pair,
+    in (field, id) order.
+    """
+    if position is None:
+        return queryset
+    timestamp, id = position
+    return queryset.filter(
+        Q(**{field + '__gt': timestamp}) |
+        Q(**{field: timestamp, 'id__gt': id}))
+
+
+def changes(request):
+    """
+    */changes/*
+
+    Returns the vendors, products and stories created or modified after the
+    ?since=<timestamp> parameter, and the ids of those deleted after it.
+    Without since, every record is returned.
+
+    Each page holds at most ?limit=<int> records of each type. If there are
+    more, the next field holds a cursor: pass it back as ?cursor=<cursor> to
+    fetch the next page. Paging stops at the until timestamp of the first
+    page, which the client should use as since for its next sync. until is
+    API_CHANGES_LAG seconds in the past, so that records saved by
+    transactions still running are not skipped.
+
+    Bad since timestamps and cursors are answered with a 400.
+    """
+    error = {
+        'status': False,
+        'name': None,
+        'text': None,
+        'level': None,
+        'debug': None
+    }
+
+    limit, error = get_limit(request, error)
+    if not limit or limit < 1:
+        limit = settings.API_PAGE_LENGTH
+
+    try:
+        if request.GET.get('cursor'):
+            state = decode_cursor(request.GET['cursor'])
+            since = parse_timestamp(state['since'])
+            until = parse_timestamp(state['until'])
+            positions = parse_positions(state['positions'])
+        else:
+            if request.GET.get('since'):
+                since = parse_timestamp(request.GET['since'])
+            else:
+                since = timezone.make_aware(datetime(1970, 1, 1), timezone.utc)
+            until = timezone.now() - timedelta(
+                seconds=settings.API_CHANGES_LAG)
+            positions = {}
+    except (BadCursorException, ValueError, KeyError, TypeError) as e:
+        error = {
+            'status': True,
+            'name': 'Bad Sync Parameters',
+            'text': 'The since timestamp or cursor is not valid.',
+            'level': 'Error',
+            'debug': "{0}: {1}".format(type(e).__name__, str(e))
+        }
+        return render_json({'error': error}, HttpResponseBadRequest)
+
+    fields, error = get_fields(request, (Vendor, Product, Story), error)
+    # The cursor is read from the modified field of the last record
+    columns = fields if fields is None else fields | set(['modified'])
+
+    serializer = FreshSerializer()
+    data = {'deleted': {}}
+    next_positions = {}
+
+    for key, model, model_name in SYNCED:
+        # A position of False marks a record type that was exhausted on an
+        # earlier page.
+        position = positions.get(key)
+        if position is not False:
+            queryset = after(
+                model.objects.filter(modified__gt=since, modified__lte=until),
+                'modified', position)
+            records = list(plan_queryset(
+                queryset.order_by('modified', 'id'), columns)[:limit])
+        else:
+            records = []
+        data[key] = serializer.serialize(
+            records, use_natural_foreign_keys=True, fields=fields)
+        if len(records) == limit:
+            next_positions[key] = [
+                records[-1].modified.isoformat(), records[-1].id]
+        else:
+            next_positions[key] = False
+
+        deleted_key = 'deleted_' + key
+        position = positions.get(deleted_key)
+        if position is not False:
+            queryset = after(
+                Tombstone.objects.filter(
+                    model=model_name, deleted__gt=since, deleted__lte=until),
+                'deleted', position)
+            tombstones = list(queryset.order_by('deleted', 'id')[:limit])
+        else:
+            tombstones = []
+        data['deleted'][key] = [t.object_id for t in tombstones]
+        if len(tombstones) == limit:
+            next_positions[deleted_key] = [
+                tombstones[-1].deleted.isoformat(), tombstones[-1].id]
+        else:
+            next_positions[deleted_key] = False
+
+    if any(next_positions.values()):
+        data['next'] = encode_cursor({
+            'since': since.isoformat(),
+            'until': until.isoformat(),
+            'positions': next_positions
+        })
+    else:
+        data['next'] = None
+
+    data['since'] = since
+    data['until'] = until
+    data['error'] = error
+
+    return render_json(data)
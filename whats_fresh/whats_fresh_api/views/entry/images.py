@@ -7,6 +7,7 @@ from django.contrib.auth.decorators import login_required
 from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
 from django.conf import settings
 
+from whats_fresh.whats_fresh_api import renditions, uploads
 from whats_fresh.whats_fresh_api.models import Image
 from whats_fresh.whats_fresh_api.forms import ImageForm
 from whats_fresh.whats_fresh_api.functions import group_required
@@ -86,7 +87,23 @@ def image(request, id=None):
             request.FILES,
             instance=instance)
         if image_form.is_valid():
-            image_form.save()
+            image = image_form.save(commit=False)
+            replaced = 'image' in image_form.changed_data
+            render = replaced
+            if replaced:
+                # A file that was uploaded before is not stored again; the
+                # new image shares it, and its renditions. If those are
+                # still being generated, the new image gets its own.
+                duplicate = uploads.find_duplicate(image)
+                if duplicate:
+                    image.image = duplicate.image.name
+                    image.renditions = duplicate.renditions
+                    render = not duplicate.renditions
+                else:
+                    image.renditions = ''
+            image.save()
+            if render:
+                renditions.schedule(image)
             return HttpResponseRedirect(
                 "%s?saved=true" % reverse('entry-list-images'))
         else:
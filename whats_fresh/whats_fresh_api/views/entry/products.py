@@ -7,13 +7,31 @@ from django.contrib.auth.decorators import login_required
 from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
 from django.conf import settings
 from django.forms.models import save_instance
+from django.db import transaction
 
 from whats_fresh.whats_fresh_api.models import (Product, Preparation,
                                                 ProductPreparation)
 from whats_fresh.whats_fresh_api.forms import ProductForm
 from whats_fresh.whats_fresh_api.functions import group_required
 
-import json
+
+def set_product_preparations(product, preparation_ids):
+    """
+    Link product to exactly the preparations with the given IDs, deleting
+    the links to any others and creating the missing ones. Unchanged links
+    are kept, along with the vendor products that refer to them.
+    """
+    existing = set(ProductPreparation.objects.filter(
+        product=product).values_list('preparation_id', flat=True))
+    wanted = set(preparation_ids)
+
+    if existing - wanted:
+        ProductPreparation.objects.filter(
+            product=product,
+            preparation_id__in=existing - wanted).delete()
+    ProductPreparation.objects.bulk_create([
+        ProductPreparation(product=product, preparation_id=preparation_id)
+        for preparation_id in wanted - existing])
 
 
 @login_required
@@ -48,10 +66,16 @@ def product(request, id=None):
             else:
                 preparations = [int(p) for p in set(
                     post_data['preparation_ids'].split(','))]
-        except MultiValueDictKeyError:
+        except (MultiValueDictKeyError, ValueError):
             errors.append("You must choose at least one preparation.")
             preparations = []
 
+        unknown = set(preparations) - set(
+            Preparation.objects.in_bulk(preparations))
+        if unknown:
+            errors.append("Unknown preparation %s." % ', '.join(
+                str(preparation) for preparation in sorted(unknown)))
+
         if id:
             product = Product.objects.get(id=id)
         else:
@@ -59,32 +83,15 @@ def product(request, id=None):
 
         product_form = ProductForm(post_data, product)
         if product_form.is_valid() and not errors:
-            if id:
-                for preparation in product.preparations.all():
-                    # Delete any that aren't in the returned list
-                    if preparation.id not in preparations:
-                        product_preparation = ProductPreparation.objects.get(
-                            product=product, preparation=preparation)
-                        product_preparation.delete()
-                    # And ignore any that are in both the existing and the
-                    # returned list
-                    elif preparation.id in preparations:
-                        preparations.remove(preparation.id)
-                # Then, create all of the new ones
-                for preparation in preparations:
-                    preparation = ProductPreparation.objects.create(
-                        product=product,
-                        preparation=Preparation.objects.get(
-                            id=preparation))
-                save_instance(product_form, product)
-            else:
-                product = Product.objects.create(**product_form.cleaned_data)
-                for preparation in preparations:
-                    product_preparation = ProductPreparation.objects.create(
-                        product=product,
-                        preparation=Preparation.objects.get(
-                            id=preparation))
-                product.save()
+            with transaction.atomic():
+                if id:
+                    set_product_preparations(product, preparations)
+                    save_instance(product_form, product)
+                else:
+                    product = Product.objects.create(
+                        **product_form.cleaned_data)
+                    set_product_preparations(product, preparations)
+                    product.save()
             return HttpResponseRedirect(
                 "%s?saved=true" % reverse('entry-list-products'))
     else:
@@ -113,22 +120,10 @@ def product(request, id=None):
         title = "New Product"
         existing_preparations = []
 
-    data = {'preparations': []}
-
-    for preparation in Preparation.objects.all():
-        data['preparations'].append({
-            'id': preparation.id,
-            'name': preparation.name
-        })
-
-    json_preparations = json.dumps(data)
-
     return render(request, 'product.html', {
         'parent_url': [
             {'url': reverse('home'), 'name': 'Home'},
             {'url': reverse('entry-list-products'), 'name': 'Products'}],
-        'json_preparations': json_preparations,
-        'preparation_dict': data,
         'existing_preparations': existing_preparations,
         'parent_text': 'Product List',
         'message': message,
@@ -0,0 +1,104 @@
+from django.http import HttpResponse
+from django.contrib.auth.decorators import login_required
+from django.conf import settings
+
+from whats_fresh.whats_fresh_api.models import (Image, Video, Preparation,
+                                                ProductPreparation)
+from whats_fresh.whats_fresh_api.functions import group_required
+
+import json
+
+
+def search_results(request, queryset, field, describe):
+    """
+    Return a JSON page of the objects in queryset whose field starts with
+    the q parameter, ignoring case, in order of that field.
+
+    Pages are PAGE_LENGTH long; the page parameter selects the page (from
+    1), and the response's next is the number of the next page, or null on
+    the last page.
+    """
+    query = request.GET.get('q', '').strip()
+    try:
+        page = max(int(request.GET.get('page', 1)), 1)
+    except ValueError:
+        page = 1
+
+    start = (page - 1) * settings.PAGE_LENGTH
+    # Fetch one extra result to find out if there is a next page
+    objects = list(queryset.filter(**{
+        '%s__istartswith' % field: query}).order_by(field, 'id')[
+            start:start + settings.PAGE_LENGTH + 1])
+
+    data = {
+        'results': [
+            describe(obj) for obj in objects[:settings.PAGE_LENGTH]],
+        'next': page + 1 if len(objects) > settings.PAGE_LENGTH else None
+    }
+    return HttpResponse(json.dumps(data), content_type='application/json')
+
+
+def describe_named(obj):
+    return {'id': obj.id, 'name': obj.name}
+
+
+@login_required
+@group_required('Administration Users', 'Data Entry Users')
+def image_search(request):
+    """
+    */entry/search/images?q=<prefix>*
+
+    Images whose name starts with q, for the story form.
+    """
+    return search_results(
+        request, Image.objects.only('id', 'name'), 'name', describe_named)
+
+
+@login_required
+@group_required('Administration Users', 'Data Entry Users')
+def video_search(request):
+    """
+    */entry/search/videos?q=<prefix>*
+
+    Videos whose name starts with q, for the story form.
+    """
+    return search_results(
+        request, Video.objects.only('id', 'name'), 'name', describe_named)
+
+
+@login_required
+@group_required('Administration Users', 'Data Entry Users')
+def preparation_search(request):
+    """
+    */entry/search/preparations?q=<prefix>*
+
+    Preparations whose name starts with q, for the product form.
+    """
+    return search_results(
+        request, Preparation.objects.only('id', 'name'), 'name',
+        describe_named)
+
+
+def describe_product_preparation(product_preparation):
+    return {
+        'id': product_preparation.id,
+        'product': product_preparation.product.name,
+        'preparation': product_preparation.preparation.name,
+        'name': '%s (%s)' % (product_preparation.product.name,
+                             product_preparation.preparation.name)
+    }
+
+
+@login_required
+@group_required('Administration Users', 'Data Entry Users')
+def product_preparation_search(request):
+    """
+    */entry/search/product-preparations?q=<prefix>*
+
+    Product preparations whose product's name starts with q, for the vendor
+    form.
+    """
+    return search_results(
+        request,
+        ProductPreparation.objects.select_related('product', 'preparation'),
+        'product__name', describe_product_preparation)
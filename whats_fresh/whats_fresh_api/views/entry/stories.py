@@ -7,8 +7,40 @@ from django.conf import settings
 from django.shortcuts import render
 from django.core.urlresolvers import reverse
 from django.shortcuts import get_object_or_404
+from django.db import transaction
 from whats_fresh.whats_fresh_api.forms import StoryForm
-import json
+
+
+def media_ids(model, keys, errors):
+    """
+    Return the set of IDs in the comma separated string keys, checking them
+    against model with one query. Bad or unknown IDs are added to errors.
+    """
+    try:
+        ids = set(int(key) for key in keys.split(',')) if keys else set()
+    except ValueError:
+        errors.append("Invalid %s list." % model._meta.verbose_name)
+        return set()
+
+    unknown = ids - set(model.objects.in_bulk(ids))
+    if unknown:
+        errors.append("Unknown %s %s." % (
+            model._meta.verbose_name,
+            ', '.join(str(key) for key in sorted(unknown))))
+    return ids
+
+
+def set_media(related, ids):
+    """
+    Make the objects in the many-to-many manager related exactly those with
+    the given IDs, removing and adding only the ones that changed, each with
+    a single query.
+    """
+    existing = set(related.values_list('id', flat=True))
+    if existing - ids:
+        related.remove(*(existing - ids))
+    if ids - existing:
+        related.add(*(ids - existing))
 
 
 @login_required
@@ -75,52 +107,28 @@ def story(request, id=None):
         message = ''
         post_data = request.POST.copy()
 
+        errors = []
+        images = media_ids(Image, post_data.get('image_ids'), errors)
+        videos = media_ids(Video, post_data.get('video_ids'), errors)
+
         story_form = StoryForm(post_data)
-        if story_form.is_valid():
-            image_keys = post_data.get('image_ids', None)
-            images = []
-            if image_keys:
-                images = [Image.objects.get(
-                    pk=int(i)) for i in image_keys.split(',')]
-            video_keys = post_data.get('video_ids', None)
-            videos = []
-            if video_keys:
-                videos = [Video.objects.get(
-                    pk=int(v)) for v in video_keys.split(',')]
-            if id:
-                story = Story.objects.get(id=id)
-                # process images
-                existing_images = story.images.all()
-                for image in existing_images:
-                    if image not in images:
-                        story.images.remove(image)
-                for image in images:
-                    if image not in existing_images:
-                        story.images.add(image)
-                # process videos
-                existing_videos = story.videos.all()
-                for video in existing_videos:
-                    if video not in videos:
-                        story.videos.remove(video)
-                for video in videos:
-                    if video not in existing_videos:
-                        story.videos.add(video)
-                story.__dict__.update(**story_form.cleaned_data)
-                story.save()
-            else:
-                story = story_form.save()
-                for image in images:
-                    story.images.add(image)
-                for video in videos:
-                    story.videos.add(video)
+        if story_form.is_valid() and not errors:
+            with transaction.atomic():
+                if id:
+                    story = Story.objects.get(id=id)
+                    story.__dict__.update(**story_form.cleaned_data)
+                    story.save()
+                else:
+                    story = story_form.save()
+                set_media(story.images, images)
+                set_media(story.videos, videos)
 
             return HttpResponseRedirect(
                 "%s?success=true" % reverse(
                     'edit-story', kwargs={'id': story.id}))
-        else:
-            pass
     else:
         message = ''
+        errors = []
 
     if id:
         story = Story.objects.get(id=id)
@@ -146,20 +154,6 @@ def story(request, id=None):
         existing_images = []
         existing_videos = []
 
-    data = {'images': [], 'videos': []}
-
-    for image in Image.objects.all():
-        data['images'].append({
-            'id': image.id,
-            'name': image.name
-        })
-
-    for video in Video.objects.all():
-        data['videos'].append({
-            'id': video.id,
-            'name': video.name
-        })
-
     return render(request, 'story.html', {
         'parent_url': [
             {'url': reverse('home'), 'name': 'Home'},
@@ -167,10 +161,9 @@ def story(request, id=None):
         ],
         'existing_images': existing_images,
         'existing_videos': existing_videos,
-        'data_json': json.dumps(data),
-        'data_dict': data,
         'title': title,
         'message': message,
+        'errors': errors,
         'post_url': post_url,
         'story_form': story_form,
     })
@@ -7,16 +7,34 @@ from django.shortcuts import get_object_or_404
 from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
 from django.contrib.auth.decorators import login_required
 from django.conf import settings
+from django.db import transaction
 
-from whats_fresh.whats_fresh_api.models import (Vendor, Product,
-                                                ProductPreparation,
+from whats_fresh.whats_fresh_api.models import (Vendor, ProductPreparation,
                                                 VendorProduct)
 from whats_fresh.whats_fresh_api.forms import VendorForm
 from whats_fresh.whats_fresh_api.functions import (group_required,
                                                    coordinates_from_address,
                                                    BadAddressException)
 
-import json
+ADDRESS_FIELDS = ('street', 'city', 'state', 'zip')
+
+
+def set_vendor_products(vendor, preparation_ids):
+    """
+    Link vendor to exactly the product preparations with the given IDs,
+    deleting the links to any others and creating the missing ones, rather
+    than recreating every link.
+    """
+    existing = set(vendor.vendorproduct_set.values_list(
+        'product_preparation_id', flat=True))
+    wanted = set(preparation_ids)
+
+    if existing - wanted:
+        vendor.vendorproduct_set.filter(
+            product_preparation_id__in=existing - wanted).delete()
+    VendorProduct.objects.bulk_create([
+        VendorProduct(vendor=vendor, product_preparation_id=preparation_id)
+        for preparation_id in wanted - existing])
 
 
 @login_required
@@ -44,13 +62,18 @@ def vendor(request, id=None):
         errors = []
 
         try:
-            coordinates = coordinates_from_address(
-                post_data['street'], post_data['city'], post_data['state'],
-                post_data['zip'])
+            address = [post_data[field] for field in ADDRESS_FIELDS]
+            existing = Vendor.objects.filter(id=id).first() if id else None
 
-            post_data['location'] = fromstr(
-                'POINT(%s %s)' % (coordinates[1], coordinates[0]),
-                srid=4326)
+            # Only geocode the address if it has changed
+            if existing and existing.location and address == [
+                    getattr(existing, field) for field in ADDRESS_FIELDS]:
+                post_data['location'] = existing.location
+            else:
+                coordinates = coordinates_from_address(*address)
+                post_data['location'] = fromstr(
+                    'POINT(%s %s)' % (coordinates[1], coordinates[0]),
+                    srid=4326)
         # Bad Address will be thrown if Google does not return coordinates for
         # the address, and MultiValueDictKeyError will be thrown if the POST
         # data being passed in is empty.
@@ -62,57 +85,44 @@ def vendor(request, id=None):
                 errors.append("You must choose at least one product.")
                 prod_preps = []
             else:
-                prod_preps = list(
-                    set(post_data['preparation_ids'].split(',')))
+                prod_preps = list(set(
+                    int(preparation_id) for preparation_id in
+                    post_data['preparation_ids'].split(',')))
                 # TODO: Find better way to do form validation
                 # Needed for form validation to pass
                 post_data['products_preparations'] = prod_preps[0]
 
-        except MultiValueDictKeyError:
+        except (MultiValueDictKeyError, ValueError):
             errors.append("You must choose at least one product.")
             prod_preps = []
 
+        unknown = set(prod_preps) - set(
+            ProductPreparation.objects.in_bulk(prod_preps))
+        if unknown:
+            errors.append("Unknown preparation %s." % ', '.join(
+                str(preparation) for preparation in sorted(unknown)))
+
         vendor_form = VendorForm(post_data)
         if vendor_form.is_valid() and not errors:
             del vendor_form.cleaned_data['products_preparations']
-            if id:
-                vendor = Vendor.objects.get(id=id)
-
-                # For all of the current vendor products,
-                for vendor_product in vendor.vendorproduct_set.all():
-                    # Delete any that aren't in the returned list
-                    if vendor_product.product_preparation.id not in prod_preps:
-                        vendor_product.delete()
-                    # And ignore any that are in both the existing and the
-                    # returned list
-                    elif vendor_product.product_preparation.id in prod_preps:
-                        prod_preps.remove(
-                            vendor_product.product_preparation.id)
-                # Then, create all of the new ones
-                for product_preparation in prod_preps:
-                    vendor_product = VendorProduct.objects.create(
-                        vendor=vendor,
-                        product_preparation=ProductPreparation.objects.get(
-                            id=product_preparation))
-                vendor.__dict__.update(**vendor_form.cleaned_data)
-                vendor.save()
-            else:
-                vendor = Vendor.objects.create(**vendor_form.cleaned_data)
-                for product_preparation in prod_preps:
-                    vendor_product = VendorProduct.objects.create(
-                        vendor=vendor,
-                        product_preparation=ProductPreparation.objects.get(
-                            id=product_preparation))
+            with transaction.atomic():
+                if id:
+                    vendor = Vendor.objects.get(id=id)
+                    set_vendor_products(vendor, prod_preps)
+                    vendor.__dict__.update(**vendor_form.cleaned_data)
+                else:
+                    vendor = Vendor.objects.create(
+                        **vendor_form.cleaned_data)
+                    set_vendor_products(vendor, prod_preps)
                 vendor.save()
             return HttpResponseRedirect(
                 "%s?saved=true" % reverse('list-vendors-edit'))
 
         existing_prod_preps = []
-        for preparation_id in prod_preps:
-            product_preparation_object = ProductPreparation.objects.get(
-                id=preparation_id)
+        for product_preparation_object in ProductPreparation.objects.filter(
+                id__in=prod_preps).select_related('product', 'preparation'):
             existing_prod_preps.append({
-                'id': preparation_id,
+                'id': product_preparation_object.id,
                 'preparation_text':
                     product_preparation_object.preparation.name,
                 'product': product_preparation_object.product.name
@@ -147,20 +157,6 @@ def vendor(request, id=None):
         message = "* = Required field"
         post_url = reverse('new-vendor')
 
-    data = {}
-    product_list = []
-
-    for product in Product.objects.all():
-        product_list.append(product.name)
-        data[str(product.name)] = []
-        for preparation in product.productpreparation_set.all():
-            data[str(product.name)].append({
-                "value": preparation.id,
-                "name": preparation.preparation.name
-            })
-
-    json_preparations = json.dumps(data)
-
     return render(request, 'vendor.html', {
         'parent_url': [
             {'url': reverse('home'), 'name': 'Home'},
@@ -171,8 +167,6 @@ def vendor(request, id=None):
         'existing_product_preparations': existing_prod_preps,
         'errors': errors,
         'vendor_form': vendor_form,
-        'json_preparations': json_preparations,
-        'product_list': product_list,
     })
 
 
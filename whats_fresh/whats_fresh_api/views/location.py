@@ -1,23 +1,55 @@
-from django.http import HttpResponse
+from zlib import crc32
+
+from django.db import connection
 from whats_fresh.whats_fresh_api.models import Vendor
-import json
+from whats_fresh.whats_fresh_api.response_cache import cache_response
+from whats_fresh.whats_fresh_api.conditional import conditional
+
+from .serializer import render_json
+
+CITIES_SQL = """
+SELECT city, COUNT(*),
+    ST_Y(ST_Centroid(ST_Collect(location))),
+    ST_X(ST_Centroid(ST_Collect(location)))
+FROM {table}
+GROUP BY city
+ORDER BY city
+"""
 
 
+def location_id(city):
+    """
+    Return the id of a city: a checksum of its name, so that it is the same
+    for every request and doesn't change as vendors are added or removed.
+    """
+    return crc32(city.encode('utf-8')) & 0xffffffff
+
+
+@cache_response
+@conditional(Vendor)
 def locations(request):
     """
     */locations/*
 
-    Returns a list of city names for all vendors. Useful for populating
-    selection lists.
+    Returns a list of city names for all vendors, with the number of
+    vendors in each city and the centroid of their locations. Useful for
+    populating selection lists.
     """
-    vendor_list = Vendor.objects.all()
-    cities = [vendor.city for vendor in vendor_list]
-    unique_cities = [
-        {'location': city[0], 'name': city[1]}
-        for city in enumerate(set(cities))]
+    cursor = connection.cursor()
+    cursor.execute(CITIES_SQL.format(table=Vendor._meta.db_table))
+
+    cities = [
+        {
+            'location': location_id(city),
+            'name': city,
+            'vendors': vendors,
+            'lat': lat,
+            'lng': lng
+        }
+        for city, vendors, lat, lng in cursor.fetchall()]
 
     data = {
-        'locations': unique_cities,
+        'locations': cities,
         'error': {
             'status': False,
             'name': None,
@@ -26,4 +58,4 @@ def locations(request):
             'debug': None
         }
     }
-    return HttpResponse(json.dumps(data), content_type="application/json")
+    return render_json(data)
@@ -1,11 +1,12 @@
-from django.http import (HttpResponse,
-                         HttpResponseNotFound)
+from django.http import HttpResponseNotFound
 from whats_fresh.whats_fresh_api.models import Preparation
+from whats_fresh.whats_fresh_api.response_cache import cache_response
 
-import json
-from .serializer import FreshSerializer
+from .serializer import (FreshSerializer, get_fields, plan_queryset,
+                         render_json)
 
 
+@cache_response
 def preparation_details(request, id=None):
     """
     */preparations/<id>*
@@ -21,9 +22,11 @@ def preparation_details(request, id=None):
         'level': None,
         'debug': None
     }
+    fields, error = get_fields(request, Preparation, error)
 
     try:
-        preparation = Preparation.objects.get(id=id)
+        preparation = plan_queryset(
+            Preparation.objects.all(), fields).get(id=id)
     except Exception as e:
         data['error'] = {
             'status': True,
@@ -32,22 +35,16 @@ def preparation_details(request, id=None):
             'level': 'Error',
             'debug': '{0}: {1}'.format(type(e).__name__, str(e))
         }
-        return HttpResponseNotFound(
-            json.dumps(data),
-            content_type="application/json"
-        )
+        return render_json(data, HttpResponseNotFound)
 
     serializer = FreshSerializer()
 
-    data = json.loads(
-        serializer.serialize(
-            [preparation],
-            use_natural_foreign_keys=True
-        )[1:-1]  # Serializer can only serialize lists,
-        # so we have to chop off the list brackets
-        # to get the serialized string without the list
+    data = serializer.serialize_object(
+        preparation,
+        use_natural_foreign_keys=True,
+        fields=fields
     )
 
     data['error'] = error
 
-    return HttpResponse(json.dumps(data), content_type="application/json")
+    return render_json(data)
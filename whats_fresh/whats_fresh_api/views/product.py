@@ -1,18 +1,24 @@
-from django.http import (HttpResponse,
-                         HttpResponseNotFound)
-from whats_fresh.whats_fresh_api.models import Product
-from whats_fresh.whats_fresh_api.functions import get_limit
+from django.http import HttpResponseNotFound
+from whats_fresh.whats_fresh_api.models import Product, Image
+from whats_fresh.whats_fresh_api.functions import get_limit, paginate
+from whats_fresh.whats_fresh_api.response_cache import cache_response
+from whats_fresh.whats_fresh_api.conditional import conditional
 
-import json
-from .serializer import FreshSerializer
+from .serializer import (FreshSerializer, get_fields, plan_queryset,
+                         render_json, should_stream, stream_json)
 
 
+@cache_response
+@conditional(Product, (Image,))
 def product_list(request):
     """
     */products/*
 
     Returns a list of all products in the database. The ?limit=<int> parameter
-    limits the number of products returned.
+    limits the number of products returned. The ?page_size=<int> and
+    ?cursor=<cursor> parameters page through the list in id order.
+
+    With the API_STREAMING setting, the whole list is streamed in id order.
     """
     error = {
         'status': False,
@@ -23,9 +29,16 @@ def product_list(request):
     }
 
     limit, error = get_limit(request, error)
+    fields, error = get_fields(request, Product, error)
+
+    if should_stream(request, limit) and Product.objects.exists():
+        return stream_json(
+            'products', Product.objects.all(), error, fields)
 
     serializer = FreshSerializer()
-    queryset = Product.objects.all()[:limit]
+    queryset, cursors, error = paginate(
+        request, plan_queryset(Product.objects.all(), fields), limit,
+        error)
 
     if not queryset:
         error = {
@@ -37,18 +50,21 @@ def product_list(request):
         }
 
     data = {
-        "products": json.loads(
-            serializer.serialize(
-                queryset,
-                use_natural_foreign_keys=True
-            )
+        "products": serializer.serialize(
+            queryset,
+            use_natural_foreign_keys=True,
+            fields=fields
         ),
         "error": error
     }
+    if cursors is not None:
+        data.update(cursors)
 
-    return HttpResponse(json.dumps(data), content_type="application/json")
+    return render_json(data)
 
 
+@cache_response
+@conditional(Product, (Image,), detail=True)
 def product_details(request, id=None):
     """
     */products/<id>*
@@ -57,8 +73,17 @@ def product_details(request, id=None):
     """
     data = {}
 
+    error = {
+        'status': False,
+        'name': None,
+        'text': None,
+        'level': None,
+        'debug': None
+    }
+    fields, error = get_fields(request, Product, error)
+
     try:
-        product = Product.objects.get(id=id)
+        product = plan_queryset(Product.objects.all(), fields).get(id=id)
     except Exception as e:
         data['error'] = {
             'status': True,
@@ -67,40 +92,30 @@ def product_details(request, id=None):
             'level': 'Error',
             'debug': '{0}: {1}'.format(type(e).__name__, str(e))
         }
-        return HttpResponseNotFound(
-            json.dumps(data),
-            content_type="application/json"
-        )
-
-    error = {
-        'status': False,
-        'name': None,
-        'text': None,
-        'level': None,
-        'debug': None
-    }
+        return render_json(data, HttpResponseNotFound)
 
     serializer = FreshSerializer()
 
-    data = json.loads(
-        serializer.serialize(
-            [product],
-            use_natural_foreign_keys=True
-        )[1:-1]
+    data = serializer.serialize_object(
+        product,
+        use_natural_foreign_keys=True,
+        fields=fields
     )
 
     data['error'] = error
 
-    return HttpResponse(json.dumps(data), content_type="application/json")
+    return render_json(data)
 
 
+@cache_response
 def product_vendor(request, id=None):
     """
     */products/vendors/<id>*
 
     List all products sold by vendor <id>. This information includes the
     details of the products, rather than only the product name/id and
-    preparation name/id returned by */vendors/<id>*.
+    preparation name/id returned by */vendors/<id>*. It can be paged like
+    */products/*.
     """
     data = {}
     error = {
@@ -111,10 +126,15 @@ def product_vendor(request, id=None):
         'debug': None
     }
     limit, error = get_limit(request, error)
+    fields, error = get_fields(request, Product, error)
 
     try:
-        product_list = Product.objects.filter(
-            productpreparation__vendorproduct__vendor__id__exact=id)[:limit]
+        product_list, cursors, error = paginate(
+            request,
+            plan_queryset(Product.objects.filter(
+                productpreparation__vendorproduct__vendor__id__exact=id),
+                fields),
+            limit, error)
     except Exception as e:
         data['error'] = {
             'status': True,
@@ -124,10 +144,7 @@ def product_vendor(request, id=None):
             'debug': "{0}: {1}".format(type(e).__name__, str(e))
         }
         data['products'] = []
-        return HttpResponse(
-            json.dumps(data),
-            content_type="application/json"
-        )
+        return render_json(data)
 
     serializer = FreshSerializer()
 
@@ -141,13 +158,14 @@ def product_vendor(request, id=None):
         }
 
     data = {
-        "products": json.loads(
-            serializer.serialize(
-                product_list,
-                use_natural_foreign_keys=True
-            )
+        "products": serializer.serialize(
+            product_list,
+            use_natural_foreign_keys=True,
+            fields=fields
         ),
         "error": error
     }
+    if cursors is not None:
+        data.update(cursors)
 
-    return HttpResponse(json.dumps(data), content_type="application/json")
+    return render_json(data)
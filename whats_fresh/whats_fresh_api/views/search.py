@@ -0,0 +1,64 @@
+from django.conf import settings
+from whats_fresh.whats_fresh_api.models import Vendor, Product, Story
+from whats_fresh.whats_fresh_api.functions import get_limit
+from whats_fresh.whats_fresh_api.response_cache import cache_response
+from whats_fresh.whats_fresh_api.search import search as search_queryset
+
+from .serializer import (FreshSerializer, get_fields, plan_queryset,
+                         render_json)
+
+
+@cache_response
+def search(request):
+    """
+    */search/?q=<text>*
+
+    Returns the products, vendors and stories matching the search text q,
+    best matches first, each with its rank in ext. The ?limit=<int>
+    parameter limits the number of each returned, by default
+    API_PAGE_LENGTH.
+    """
+    error = {
+        'status': False,
+        'name': None,
+        'text': None,
+        'level': None,
+        'debug': None
+    }
+
+    limit, error = get_limit(request, error)
+    limit = limit or settings.API_PAGE_LENGTH
+    query = request.GET.get('q', '').strip()
+    fields, error = get_fields(request, (Product, Vendor, Story), error)
+
+    serializer = FreshSerializer()
+    data = {}
+    for key, model in (('products', Product), ('vendors', Vendor),
+                       ('stories', Story)):
+        if query:
+            queryset = plan_queryset(
+                search_queryset(model.objects.all(), query), fields)[:limit]
+        else:
+            queryset = []
+        data[key] = serializer.serialize(
+            queryset, use_natural_foreign_keys=True, fields=fields)
+
+    if not query:
+        error = {
+            'status': True,
+            'name': 'No Search Text',
+            'text': 'No search text was given',
+            'level': 'Error',
+            'debug': ''
+        }
+    elif not (data['products'] or data['vendors'] or data['stories']):
+        error = {
+            'status': True,
+            'name': 'No Results',
+            'text': 'Nothing matched %s' % query,
+            'level': 'Information',
+            'debug': ''
+        }
+
+    data['error'] = error
+    return render_json(data)
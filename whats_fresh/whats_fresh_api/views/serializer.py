@@ -1,26 +1,267 @@
-from django.core.serializers import json
-from whats_fresh.whats_fresh_api.models import Vendor
+from django.core.serializers import python
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Prefetch
+from django.conf import settings
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.encoding import smart_text
+from whats_fresh.whats_fresh_api.models import (Vendor, Product, Story,
+                                                Preparation,
+                                                ProductPreparation)
 
+import json
 
-class FreshSerializer(json.Serializer):
+
+class FreshSerializer(python.Serializer):
+
+    """
+    Serializes model instances to plain Python dicts, ready to be placed in
+    a response envelope and encoded once by render_json.
+
+    serialize() returns a list of dicts, one per object; serialize_object()
+    returns the single dict for one object, for the details views.
+
+    Related objects are read through .all(), so querysets prepared with
+    plan_queryset are serialized from their prefetched results.
+    """
+
+    def serialize(self, queryset, **options):
+        # fields are the names of the response fields wanted (see
+        # get_fields); Django's serializer wants the model fields they come
+        # from.
+        self.output_fields = options.pop('fields', None)
+        if self.output_fields is not None:
+            options['fields'] = model_fields(self.output_fields)
+        return super(FreshSerializer, self).serialize(queryset, **options)
+
+    def wants(self, name):
+        return self.output_fields is None or name in self.output_fields
 
     def get_dump_object(self, obj):
         self._current['id'] = obj.id
+        ext = {}
 
         if isinstance(obj, Vendor):
-            self._current['lat'] = obj.location.y
-            self._current['lng'] = obj.location.x
-            del self._current['location']
-
-            self._current['products'] = [
-                {
-                    'name': pp.product.name,
-                    'preparation': pp.preparation.name,
-                    'product_id': pp.product.id,
-                    'preparation_id': pp.preparation_id
-                }
-                for pp in obj.products_preparations.all()
-            ]
-
-        self._current['ext'] = {}
+            # The keys are set and removed in the order they always were, so
+            # that they are encoded in the same order.
+            if self.wants('lat'):
+                self._current['lat'] = obj.location.y
+            if self.wants('lng'):
+                self._current['lng'] = obj.location.x
+            self._current.pop('location', None)
+
+            if self.wants('products'):
+                self._current['products'] = [
+                    {
+                        'name': pp.product.name,
+                        'preparation': pp.preparation.name,
+                        'product_id': pp.product.id,
+                        'preparation_id': pp.preparation_id
+                    }
+                    for pp in obj.products_preparations.all()
+                ]
+
+            # Selected by nearest_first
+            if getattr(obj, 'distance_mi', None) is not None:
+                ext['distance'] = obj.distance_mi
+
+        # Preparations are only stamped for the conditional GET validators
+        if isinstance(obj, Preparation):
+            self._current.pop('modified', None)
+
+        # Selected by full-text search
+        if getattr(obj, 'search_rank', None) is not None:
+            ext['rank'] = obj.search_rank
+
+        self._current['ext'] = ext
         return self._current
+
+    def handle_m2m_field(self, obj, field):
+        # Django's serializer walks many-to-many relations with iterator(),
+        # which skips any prefetched results; use all() so that the
+        # prefetch_related lookups from plan_queryset are honoured.
+        if not field.rel.through._meta.auto_created:
+            return
+
+        natural = (self.use_natural_foreign_keys and
+                   hasattr(field.rel.to, 'natural_key'))
+        values = []
+        for related in getattr(obj, field.name).all():
+            if natural:
+                values.append(related.natural_key())
+            else:
+                values.append(
+                    smart_text(related._get_pk_val(), strings_only=True))
+        self._current[field.name] = values
+
+    def serialize_object(self, obj, **options):
+        return self.serialize([obj], **options)[0]
+
+
+# Response fields which are not model fields, for each model, and the model
+# fields they are read from
+COMPUTED_FIELDS = {
+    Vendor: {'lat': ('location',), 'lng': ('location',), 'products': ()},
+}
+
+# Model fields which are not response fields
+HIDDEN_FIELDS = {
+    Vendor: ('location', 'products_preparations'),
+    Product: ('preparations',),
+    Preparation: ('modified',),
+}
+
+
+def response_fields(model):
+    """
+    Return the names of the fields in the responses for model.
+    """
+    names = set(['id', 'ext'])
+    names.update(field.name for field in model._meta.fields)
+    names.update(field.name for field in model._meta.many_to_many)
+    names.update(COMPUTED_FIELDS.get(model, {}))
+    return names - set(HIDDEN_FIELDS.get(model, ()))
+
+
+def model_fields(fields):
+    """
+    Return the model fields that the response fields named in fields are
+    read from.
+    """
+    names = set()
+    for name in fields:
+        for computed in COMPUTED_FIELDS.values():
+            names.update(computed.get(name, ()))
+        names.add(name)
+    return names
+
+
+def get_fields(request, models, error=None):
+    """
+    Parse the ?fields=<name>,<name>... parameter, which limits the fields
+    of each object in the response to those named (and id and ext, which
+    are always returned). Returns [fields, error]; fields is None if every
+    field is wanted.
+
+    models is the model, or a tuple of the models, in the response. Names
+    which aren't fields of any of them are ignored, and the error block is
+    updated to reflect that.
+    """
+    value = request.GET.get('fields', None)
+    if value is None:
+        return [None, error]
+
+    if not isinstance(models, tuple):
+        models = (models,)
+    known = set()
+    for model in models:
+        known.update(response_fields(model))
+
+    fields = set(name.strip() for name in value.split(',') if name.strip())
+    unknown = fields - known
+    if unknown:
+        error = {
+            'debug': '',
+            'status': True,
+            'level': 'Warning',
+            'text': 'Unknown fields {0}. Ignoring them.'.format(
+                ', '.join(sorted(unknown))),
+            'name': 'Bad Fields'
+        }
+    return [(fields & known) | set(['id', 'ext']), error]
+
+
+def plan_queryset(queryset, fields=None):
+    """
+    Return queryset with the select_related/prefetch_related lookups needed
+    to serialize its model without issuing a query per object. Querysets
+    for models without a plan are returned unchanged.
+
+    If fields (from get_fields) is given, only the columns and relations
+    those fields are read from are fetched.
+    """
+    model = queryset.model
+    wanted = None
+    if fields is not None:
+        wanted = model_fields(fields)
+        columns = [field.name for field in model._meta.concrete_fields
+                   if field.name in wanted]
+        queryset = queryset.only('id', *columns)
+
+    if model is Vendor:
+        if wanted is None or 'products' in wanted:
+            queryset = queryset.prefetch_related(Prefetch(
+                'products_preparations',
+                queryset=ProductPreparation.objects.select_related(
+                    'product', 'preparation')))
+    elif model is Product:
+        if wanted is None or 'image' in wanted:
+            queryset = queryset.select_related('image')
+    elif model is Story:
+        queryset = queryset.prefetch_related(*[
+            name for name in ('images', 'videos')
+            if wanted is None or name in wanted])
+    return queryset
+
+
+def render_json(data, response_class=HttpResponse):
+    """
+    Encode the response envelope in a single pass and wrap it in
+    response_class. Dates and other non-JSON types left in the serialized
+    dicts are encoded the same way Django's JSON serializer encodes them.
+    """
+    return response_class(
+        json.dumps(data, cls=DjangoJSONEncoder),
+        content_type="application/json")
+
+
+def should_stream(request, limit):
+    """
+    Return True if a list view should stream its response: streaming is
+    turned on with the API_STREAMING setting, and only used for whole,
+    unpaged listings.
+    """
+    return (getattr(settings, 'API_STREAMING', False) and limit is None and
+            'cursor' not in request.GET and 'page_size' not in request.GET)
+
+
+def chunked(queryset, chunk_size, fields=None):
+    """
+    Yield the objects of queryset in id order, as lists of at most
+    chunk_size objects, each fetched with its plan_queryset lookups.
+    """
+    last = None
+    while True:
+        if last is not None:
+            page = queryset.filter(id__gt=last)
+        else:
+            page = queryset
+        chunk = list(
+            plan_queryset(page.order_by('id'), fields)[:chunk_size])
+        if chunk:
+            yield chunk
+        if len(chunk) < chunk_size:
+            return
+        last = chunk[-1].id
+
+
+def stream_json(key, queryset, error, fields=None):
+    """
+    Stream the envelope {key: [...], "error": error} for queryset, encoding
+    it a chunk of API_STREAM_CHUNK_SIZE objects at a time so memory use does
+    not grow with the size of the table. The output is the same JSON that
+    render_json produces.
+    """
+    serializer = FreshSerializer()
+
+    def generate():
+        yield '{%s: [' % json.dumps(key)
+        separator = ''
+        for chunk in chunked(
+                queryset, settings.API_STREAM_CHUNK_SIZE, fields):
+            for obj in serializer.serialize(
+                    chunk, use_natural_foreign_keys=True, fields=fields):
+                yield separator + json.dumps(obj, cls=DjangoJSONEncoder)
+                separator = ', '
+        yield '], "error": %s}' % json.dumps(error)
+
+    return StreamingHttpResponse(generate(), content_type="application/json")
@@ -1,12 +1,18 @@
-from django.http import (HttpResponse,
-                         HttpResponseNotFound)
-from whats_fresh.whats_fresh_api.models import Story
-from whats_fresh.whats_fresh_api.functions import get_limit
+from django.http import HttpResponseNotFound
+from whats_fresh.whats_fresh_api.models import Story, Image, Video
+from whats_fresh.whats_fresh_api.functions import get_limit, paginate
+from whats_fresh.whats_fresh_api.response_cache import cache_response
+from whats_fresh.whats_fresh_api.conditional import conditional
 
-import json
-from .serializer import FreshSerializer
+from .serializer import (FreshSerializer, get_fields, plan_queryset,
+                         render_json)
 
 
+STORY_RELATED = (Image, Video, Story.images.through, Story.videos.through)
+
+
+@cache_response
+@conditional(Story, STORY_RELATED, detail=True)
 def story_details(request, id=None):
     """
     */stories/<id>*
@@ -22,9 +28,10 @@ def story_details(request, id=None):
         'level': None,
         'debug': None
     }
+    fields, error = get_fields(request, Story, error)
 
     try:
-        story = Story.objects.get(id=id)
+        story = plan_queryset(Story.objects.all(), fields).get(id=id)
     except Exception as e:
         data['error'] = {
             'status': True,
@@ -33,33 +40,30 @@ def story_details(request, id=None):
             'level': 'Error',
             'debug': '{0}: {1}'.format(type(e).__name__, str(e))
         }
-        return HttpResponseNotFound(
-            json.dumps(data),
-            content_type="application/json"
-        )
+        return render_json(data, HttpResponseNotFound)
 
     serializer = FreshSerializer()
 
-    data = json.loads(
-        serializer.serialize(
-            [story],
-            use_natural_foreign_keys=True
-        )[1:-1]  # Serializer can only serialize lists,
-                 # so we have to chop off the list brackets
-                 # to get the serialized string without the list
-        )
+    data = serializer.serialize_object(
+        story,
+        use_natural_foreign_keys=True,
+        fields=fields
+    )
 
     data['error'] = error
 
-    return HttpResponse(json.dumps(data), content_type="application/json")
+    return render_json(data)
 
 
+@cache_response
+@conditional(Story, STORY_RELATED)
 def story_list(request):
     """
     */stories/*
 
     Returns a list of all stories in the database. The ?limit=<int> parameter
-    limits the number of stories returned.
+    limits the number of stories returned. The ?page_size=<int> and
+    ?cursor=<cursor> parameters page through the list in id order.
     """
     error = {
         'status': False,
@@ -70,9 +74,11 @@ def story_list(request):
     }
 
     limit, error = get_limit(request, error)
+    fields, error = get_fields(request, Story, error)
 
     serializer = FreshSerializer()
-    queryset = Story.objects.all()[:limit]
+    queryset, cursors, error = paginate(
+        request, plan_queryset(Story.objects.all(), fields), limit, error)
 
     if not queryset:
         error = {
@@ -83,12 +89,13 @@ def story_list(request):
             "debug": ""
         }
     data = {
-        "stories": json.loads(
-            serializer.serialize(
-                queryset,
-                use_natural_foreign_keys=True
-            )
+        "stories": serializer.serialize(
+            queryset,
+            use_natural_foreign_keys=True,
+            fields=fields
         ),
         "error": error
     }
-    return HttpResponse(json.dumps(data), content_type="application/json")
+    if cursors is not None:
+        data.update(cursors)
+    return render_json(data)
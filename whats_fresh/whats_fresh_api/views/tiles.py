@@ -0,0 +1,114 @@
+from math import atan, degrees, pi, sinh
+
+from django.conf import settings
+from django.db import connection
+from django.http import HttpResponseNotFound
+from whats_fresh.whats_fresh_api.models import Vendor
+from whats_fresh.whats_fresh_api.response_cache import cache_response
+from whats_fresh.whats_fresh_api.conditional import conditional
+
+from .serializer import render_json
+
+# Vendors in a tile. && compares bounding boxes, so it is answered from the
+# spatial index on location; the tile's east and north edges are excluded so
+# that a vendor on the edge between two tiles is only in one of them.
+TILE_WHERE = """
+WHERE location && ST_MakeEnvelope(%s, %s, %s, %s, 4326)
+    AND ST_X(location) < %s AND ST_Y(location) < %s
+"""
+
+MARKERS_SQL = """
+SELECT 1, id, name, ST_Y(location), ST_X(location)
+FROM {table}
+""" + TILE_WHERE + """
+ORDER BY id
+"""
+
+# Vendors in a tile, grouped into the cells of a grid laid over it
+CLUSTERS_SQL = """
+SELECT COUNT(*), MIN(id), MIN(name),
+    ST_Y(ST_Centroid(ST_Collect(location))),
+    ST_X(ST_Centroid(ST_Collect(location)))
+FROM {table}
+""" + TILE_WHERE + """
+GROUP BY ST_SnapToGrid(location, %s, %s)
+ORDER BY MIN(id)
+"""
+
+
+def tile_latitude(y, z):
+    """
+    Return the latitude of the north edge of row y of the tiles at zoom z.
+    """
+    return degrees(atan(sinh(pi * (1 - 2.0 * y / 2 ** z))))
+
+
+def tile_bounds(z, x, y):
+    """
+    Return the (west, south, east, north) bounds in degrees of tile x, y at
+    zoom z, numbered as by OpenStreetMap and Google Maps: 2**z by 2**z
+    Web Mercator tiles, counted from the north-west corner.
+    """
+    size = 360.0 / 2 ** z
+    return (x * size - 180, tile_latitude(y + 1, z),
+            (x + 1) * size - 180, tile_latitude(y, z))
+
+
+@cache_response
+@conditional(Vendor)
+def vendor_tiles(request, z=None, x=None, y=None):
+    """
+    */vendors/tiles/<z>/<x>/<y>*
+
+    Returns map markers for the vendors in tile x, y at zoom z: the id,
+    name, lat and lng of each vendor. Below zoom API_TILE_CLUSTER_ZOOM, the
+    tile is divided into an API_TILE_CLUSTER_GRID by API_TILE_CLUSTER_GRID
+    grid, and the vendors sharing a cell are returned as a single cluster
+    of the number of vendors and the centroid of their locations.
+    """
+    z, x, y = int(z), int(x), int(y)
+    if z > settings.API_TILE_MAX_ZOOM or x >= 2 ** z or y >= 2 ** z:
+        data = {
+            'error': {
+                'status': True,
+                'name': 'Tile Not Found',
+                'text': 'Tile %s/%s/%s was not found.' % (z, x, y),
+                'level': 'Error',
+                'debug': ''
+            }
+        }
+        return render_json(data, HttpResponseNotFound)
+
+    west, south, east, north = tile_bounds(z, x, y)
+    params = [west, south, east, north, east, north]
+    table = Vendor._meta.db_table
+
+    cursor = connection.cursor()
+    if z < settings.API_TILE_CLUSTER_ZOOM:
+        grid = settings.API_TILE_CLUSTER_GRID
+        cursor.execute(
+            CLUSTERS_SQL.format(table=table),
+            params + [(east - west) / grid, (north - south) / grid])
+    else:
+        cursor.execute(MARKERS_SQL.format(table=table), params)
+
+    markers = []
+    clusters = []
+    for vendors, id, name, lat, lng in cursor.fetchall():
+        if vendors == 1:
+            markers.append({'id': id, 'name': name, 'lat': lat, 'lng': lng})
+        else:
+            clusters.append({'vendors': vendors, 'lat': lat, 'lng': lng})
+
+    data = {
+        'markers': markers,
+        'clusters': clusters,
+        'error': {
+            'status': False,
+            'name': None,
+            'text': None,
+            'level': None,
+            'debug': None
+        }
+    }
+    return render_json(data)
@@ -1,19 +1,39 @@
-from django.http import (HttpResponse,
-                         HttpResponseNotFound)
+from django.http import HttpResponseNotFound
 from django.contrib.gis.measure import D
-from whats_fresh.whats_fresh_api.models import Vendor
-from whats_fresh.whats_fresh_api.functions import get_lat_long_prox
+from whats_fresh.whats_fresh_api.models import (Vendor, Product, Preparation,
+                                                ProductPreparation,
+                                                VendorProduct)
+from whats_fresh.whats_fresh_api.functions import (get_lat_long_prox,
+                                                   get_nearest, nearest_first,
+                                                   filter_vendors, paginate)
+from whats_fresh.whats_fresh_api.response_cache import cache_response
+from whats_fresh.whats_fresh_api.conditional import conditional
 
-import json
-from .serializer import FreshSerializer
+from .serializer import (FreshSerializer, get_fields, plan_queryset,
+                         render_json, should_stream, stream_json)
 
 
+VENDOR_RELATED = (Product, Preparation, ProductPreparation, VendorProduct)
+
+
+@cache_response
+@conditional(Vendor, VENDOR_RELATED)
 def vendor_list(request):
     """
     */vendors/*
 
     List all vendors in the database. There is no order to this list,
-    only whatever is returned by the database.
+    only whatever is returned by the database, unless it is paged with the
+    ?page_size=<int> and ?cursor=<cursor> parameters, which order it by id.
+
+    With the API_STREAMING setting, the whole list is streamed in id order.
+
+    Given a location, ?nearest=true orders the list nearest-first, and
+    ?k=<int> returns only the k nearest vendors. Each vendor's distance in
+    miles is then returned in its ext block.
+
+    The list can be filtered with ?city=<name>, ?product=<id>,
+    ?preparation=<id>, ?available=<true|false> and ?status=<true|false>.
     """
     error = {
         'status': False,
@@ -25,12 +45,25 @@ def vendor_list(request):
     data = {}
 
     point, proximity, limit, error = get_lat_long_prox(request, error)
+    nearest, k, error = get_nearest(request, error)
+    fields, error = get_fields(request, Vendor, error)
 
     if point:
         vendor_list = Vendor.objects.filter(
-            location__distance_lte=(point, D(mi=proximity)))[:limit]
+            location__distance_lte=(point, D(mi=proximity)))
     else:
-        vendor_list = Vendor.objects.all()[:limit]
+        vendor_list = Vendor.objects.all()
+    vendor_list, error = filter_vendors(request, vendor_list, error)
+
+    if point and nearest:
+        vendor_list = plan_queryset(
+            nearest_first(vendor_list, point), fields)[:k or limit]
+        cursors = None
+    elif should_stream(request, limit) and vendor_list.exists():
+        return stream_json('vendors', vendor_list, error, fields)
+    else:
+        vendor_list, cursors, error = paginate(
+            request, plan_queryset(vendor_list, fields), limit, error)
 
     if not vendor_list:
         error = {
@@ -44,24 +77,27 @@ def vendor_list(request):
     serializer = FreshSerializer()
 
     data = {
-        "vendors": json.loads(
-            serializer.serialize(
-                vendor_list,
-                use_natural_foreign_keys=True
-            )
+        "vendors": serializer.serialize(
+            vendor_list,
+            use_natural_foreign_keys=True,
+            fields=fields
         ),
         "error": error
     }
+    if cursors is not None:
+        data.update(cursors)
 
-    return HttpResponse(json.dumps(data), content_type="application/json")
+    return render_json(data)
 
 
+@cache_response
 def vendors_products(request, id=None):
     """
     */vendors/products/<id>*
 
     List all vendors in the database that sell product <id>.
-    There is no order to this list, only whatever is returned by the database.
+    There is no order to this list, only whatever is returned by the database,
+    unless it is paged or ordered nearest-first (see */vendors/*).
     """
     error = {
         'status': False,
@@ -73,15 +109,24 @@ def vendors_products(request, id=None):
     data = {}
 
     point, proximity, limit, error = get_lat_long_prox(request, error)
+    nearest, k, error = get_nearest(request, error)
+    fields, error = get_fields(request, Vendor, error)
     try:
         if point:
             vendor_list = Vendor.objects.filter(
                 vendorproduct__product_preparation__product__id__exact=id,
-                location__distance_lte=(point, D(mi=proximity)))[:limit]
+                location__distance_lte=(point, D(mi=proximity)))
         else:
             vendor_list = Vendor.objects.filter(
                 vendorproduct__product_preparation__product__id__exact=id
-            )[:limit]
+            )
+        if point and nearest:
+            vendor_list = plan_queryset(
+                nearest_first(vendor_list, point), fields)[:k or limit]
+            cursors = None
+        else:
+            vendor_list, cursors, error = paginate(
+                request, plan_queryset(vendor_list, fields), limit, error)
 
     except Exception as e:
         error = {
@@ -91,10 +136,7 @@ def vendors_products(request, id=None):
             'level': 'Error',
             'debug': "{0}: {1}".format(type(e).__name__, str(e))
         }
-        return HttpResponseNotFound(
-            json.dumps(data),
-            content_type="application/json"
-        )
+        return render_json(data, HttpResponseNotFound)
 
     if not vendor_list:
         error = {
@@ -108,18 +150,21 @@ def vendors_products(request, id=None):
     serializer = FreshSerializer()
 
     data = {
-        "vendors": json.loads(
-            serializer.serialize(
-                vendor_list,
-                use_natural_foreign_keys=True
-            )
+        "vendors": serializer.serialize(
+            vendor_list,
+            use_natural_foreign_keys=True,
+            fields=fields
         ),
         "error": error
     }
+    if cursors is not None:
+        data.update(cursors)
 
-    return HttpResponse(json.dumps(data), content_type="application/json")
+    return render_json(data)
 
 
+@cache_response
+@conditional(Vendor, VENDOR_RELATED, detail=True)
 def vendor_details(request, id=None):
     """
     */vendors/<id>*
@@ -135,9 +180,10 @@ def vendor_details(request, id=None):
         'level': None,
         'debug': None
     }
+    fields, error = get_fields(request, Vendor, error)
 
     try:
-        vendor = Vendor.objects.get(id=id)
+        vendor = plan_queryset(Vendor.objects.all(), fields).get(id=id)
     except Exception as e:
         data['error'] = {
             'status': True,
@@ -146,22 +192,16 @@ def vendor_details(request, id=None):
             'level': 'Error',
             'debug': "{0}: {1}".format(type(e).__name__, str(e))
         }
-        return HttpResponseNotFound(
-            json.dumps(data),
-            content_type="application/json"
-        )
+        return render_json(data, HttpResponseNotFound)
 
     serializer = FreshSerializer()
 
-    data = json.loads(
-        serializer.serialize(
-            [vendor],
-            use_natural_foreign_keys=True
-        )[1:-1]  # Serializer can only serialize lists,
-        # so we have to chop off the list brackets
-        # to get the serialized string without the list
+    data = serializer.serialize_object(
+        vendor,
+        use_natural_foreign_keys=True,
+        fields=fields
     )
 
     data['error'] = error
 
-    return HttpResponse(json.dumps(data), content_type="application/json")
+    return render_json(data)
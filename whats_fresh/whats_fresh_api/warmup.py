@@ -0,0 +1,31 @@
+from django.core.urlresolvers import get_resolver
+from django.db import connections
+
+
+def view_callbacks(patterns):
+    for pattern in patterns:
+        if hasattr(pattern, 'url_patterns'):
+            for callback in view_callbacks(pattern.url_patterns):
+                yield callback
+        else:
+            # Views named by their dotted path are imported when their
+            # callback is first read
+            yield pattern.callback
+
+
+def warm_up(connect=True):
+    """
+    Import every view in the URLconf, and, if connect is True, connect to
+    every database, so that the first requests a server process answers
+    don't pay for it. Run by the serve command in each worker before it
+    accepts requests.
+
+    Connections belong to the thread which opens them, so they are only
+    used by requests answered in the calling thread, and only kept for
+    those requests if CONN_MAX_AGE allows persistent connections.
+    """
+    views = list(view_callbacks(get_resolver(None).url_patterns))
+    if connect:
+        for alias in connections:
+            connections[alias].ensure_connection()
+    return views